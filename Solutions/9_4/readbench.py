@@ -0,0 +1,287 @@
+# readbench.py
+#
+# Timings for the structly reader.  Run from this directory.
+
+import os
+import sys
+import tempfile
+from timeit import repeat
+from structly import reader, Structure
+from stock import Stock
+
+class Ticker(Structure):
+    name = String()
+    price = Float()
+    date = String()
+    time = String()
+    change = Float()
+    open = Float()
+    high = Float()
+    low = Float()
+    volume = Integer()
+
+def bench(label, func, nrows, number=5):
+    # Best of number runs, which is the least disturbed by other load
+    t = min(repeat(func, number=1, repeat=number))
+    print('%-30s %8.1f ms  %10.0f rows/s' % (label, t * 1000, nrows / t))
+
+def bench_converters(nrows=100000):
+    '''
+    Compiled row converters versus the generic lambda path
+    '''
+    headers = ['name', 'shares', 'price']
+    types = [str, int, float]
+    rows = [ ['AA', str(n), '32.20'] for n in range(nrows) ]
+
+    def run(converter):
+        return lambda: [ converter(headers, row) for row in rows ]
+
+    bench('dicts (lambda)',
+          run(lambda headers, row: { name: func(val) for name, func, val in zip(headers, types, row) }),
+          nrows)
+    bench('dicts (compiled)', run(reader.dict_converter(headers, types)), nrows)
+    bench('instances (lambda)', run(lambda headers, row: Stock.from_row(row)), nrows)
+    bench('instances (compiled)', run(reader.instance_converter(headers, Stock)), nrows)
+
+def make_rides(filename, nrows):
+    '''
+    Write a quote-free file shaped like ctabus.csv
+    '''
+    with open(filename, 'w') as f:
+        f.write('route,date,daytype,rides\n')
+        for n in range(nrows):
+            f.write('%d,%02d/%02d/20%02d,%s,%d\n' % (n % 180, n % 12 + 1, n % 28 + 1, n % 12,
+                                                     'UWA'[n % 3], n % 10000))
+
+def make_ticks(filename, nrows):
+    '''
+    Write a file of Ticker rows where 1% of the rows have change < 0
+    '''
+    with open(filename, 'w') as f:
+        f.write(','.join(Ticker._fields) + '\n')
+        for n in range(nrows):
+            change = -0.5 if n % 100 == 0 else 0.25
+            f.write('"IBM",%.2f,"6/11/2007","09:%02d.%02d",%.2f,102.87,103.0,102.5,%d\n' %
+                    (100 + n % 7, n % 60, n % 100, change, n))
+
+def bench_where(nrows=100000):
+    '''
+    Filtering during the read (where=) versus reading then filtering
+    '''
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'ticks.csv')
+        make_ticks(filename, nrows)
+        bench('ticks (read then filter)',
+              lambda: [ rec for rec in reader.read_csv_as_instances(filename, Ticker)
+                        if rec.change < 0 ], nrows, 3)
+        bench('ticks (where=)',
+              lambda: reader.read_csv_as_instances(filename, Ticker,
+                                                   where=lambda change: change < 0), nrows, 3)
+
+def bench_compressed(nrows=200000):
+    '''
+    Reading gzip data with and without a decompression thread
+    '''
+    import gzip
+    types = [sys.intern, sys.intern, sys.intern, int]
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'rides.csv')
+        make_rides(filename, nrows)
+        with open(filename, 'rb') as src, gzip.open(filename + '.gz', 'wb') as dst:
+            dst.write(src.read())
+        bench('gzip dicts', lambda: reader.read_csv_as_dicts(filename + '.gz', types), nrows, 3)
+        bench('gzip dicts (threaded)',
+              lambda: reader.read_csv_as_dicts(filename + '.gz', types, threaded=True), nrows, 3)
+
+def bench_errors(nrows=200000):
+    '''
+    A clean file versus one where 30% of the rows fail conversion
+    '''
+    import logging
+    logging.getLogger('structly.reader').setLevel(logging.ERROR)
+    types = [str, int, float]
+    with tempfile.TemporaryDirectory() as tmp:
+        clean = os.path.join(tmp, 'clean.csv')
+        dirty = os.path.join(tmp, 'dirty.csv')
+        for filename, nbad in [(clean, 0), (dirty, 30)]:
+            with open(filename, 'w') as f:
+                f.write('name,shares,price\n')
+                for n in range(nrows):
+                    f.write('AA,%s,32.20\n' % ('' if n % 100 < nbad else n))
+        bench('clean', lambda: reader.read_csv_as_dicts(clean, types), nrows, 3)
+        for errors in ['warn', 'skip', 'fill']:
+            bench(f'30% bad ({errors})',
+                  lambda: reader.read_csv_as_dicts(dirty, types, errors=errors), nrows, 3)
+        bench('30% bad (ErrorReport)',
+              lambda: reader.read_csv_as_dicts(dirty, types, errors=reader.ErrorReport()), nrows, 3)
+
+def bench_memo(nrows=200000):
+    '''
+    Reading with and without a ConversionCache in front of the converters
+    '''
+    from datetime import date
+
+    def parse_date(s):
+        month, day, year = s.split('/')
+        return date(int(year), int(month), int(day))
+
+    types = [int, parse_date, sys.intern, int]
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'rides.csv')
+        make_rides(filename, nrows)
+        bench('rides', lambda: reader.read_csv_as_dicts(filename, types), nrows, 3)
+        memo = reader.ConversionCache(4096)
+        bench('rides (memo)', lambda: reader.read_csv_as_dicts(filename, types, memo=memo), nrows, 3)
+        memo = reader.ConversionCache(4096, columns=['route', 'date', 'daytype'])
+        bench('rides (memo, 3 columns)',
+              lambda: reader.read_csv_as_dicts(filename, types, memo=memo), nrows, 3)
+        for name, stats in memo.stats().items():
+            print('  %-10s hit rate %5.1f%%  %d entries' % (name, stats['hit_rate'] * 100, stats['entries']))
+
+def bench_sample(nrows=200000):
+    '''
+    Sampling 100 rows versus reading every row
+    '''
+    from structly import sample_csv
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'ticks.csv')
+        make_ticks(filename, nrows)
+        bench('ticks (read all)', lambda: reader.read_csv_as_instances(filename, Ticker), nrows, 3)
+        bench('ticks (sample)', lambda: sample_csv(filename, Ticker, 100), nrows, 3)
+        bench('ticks (sample, seek)', lambda: sample_csv(filename, Ticker, 100, seek=True), nrows, 3)
+
+def bench_many(nfiles=50, nrows=5000):
+    '''
+    Reading many files one after another versus with read_many()
+    '''
+    types = [sys.intern, sys.intern, sys.intern, int]
+    with tempfile.TemporaryDirectory() as tmp:
+        filenames = [ os.path.join(tmp, f'rides{n}.csv') for n in range(nfiles) ]
+        for filename in filenames:
+            make_rides(filename, nrows)
+        nrows *= nfiles
+        bench('sequential', lambda: [ row for filename in filenames
+                                      for row in reader.read_csv_as_dicts(filename, types) ],
+              nrows, 3)
+        bench('read_many (threads)', lambda: reader.read_many(filenames, types, workers=4), nrows, 3)
+        bench('read_many (processes)',
+              lambda: reader.read_many(filenames, types, processes=True), nrows, 3)
+
+def bench_dat(nrows=200000):
+    '''
+    Hand-splitting a .dat file (as pcost does) versus read_dat_as_instances()
+    '''
+    from structly import read_dat_as_instances
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'portfolio.dat')
+        with open(filename, 'w') as f:
+            for n in range(nrows):
+                f.write('IBM %d %.2f\n' % (n % 1000 + 1, 50 + n % 100))
+
+        def hand_split():
+            with open(filename) as f:
+                return [ Stock(name, int(shares), float(price))
+                         for name, shares, price in map(str.split, f) ]
+
+        bench('.dat (hand split)', hand_split, nrows, 3)
+        bench('.dat (read_dat_as_instances)', lambda: read_dat_as_instances(filename, Stock), nrows, 3)
+
+def bench_write(nrows=1000000):
+    '''
+    Writing instances with print_table versus write_csv_from_instances()
+    '''
+    import contextlib
+    from structly import print_table, create_formatter, write_csv_from_instances
+    port = reader.read_csv_as_instances('../../Data/portfolio.csv', Stock)
+    port = (port * (nrows // len(port) + 1))[:nrows]
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, 'port.csv')
+
+        def table():
+            with open(filename, 'w') as f, contextlib.redirect_stdout(f):
+                print_table(port, Stock._fields, create_formatter('csv'))
+
+        bench('print_table (csv)', table, nrows, 1)
+        bench('write_csv_from_instances', lambda: write_csv_from_instances(filename, port), nrows, 1)
+        bench('write_csv_from_instances (gz)',
+              lambda: write_csv_from_instances(filename + '.gz', port), nrows, 1)
+
+def bench_colfile(nrows=1000000):
+    '''
+    Summing a column: reading the CSV file versus opening a column file
+    '''
+    from structly import read_csv_as_columns, write_colfile, read_colfile
+    types = [int, str, str, int]
+    with tempfile.TemporaryDirectory() as tmp:
+        csvname = os.path.join(tmp, 'rides.csv')
+        colname = os.path.join(tmp, 'rides.col')
+        make_rides(csvname, nrows)
+        write_colfile(colname, read_csv_as_columns(csvname, types))
+
+        def from_csv():
+            return sum(read_csv_as_columns(csvname, types).column('rides'))
+
+        def from_colfile():
+            with read_colfile(colname) as data:
+                rides = data.column('rides')
+                total = sum(rides)
+                rides.release()
+            return total
+
+        bench('read_csv_as_columns + sum', from_csv, nrows, 1)
+        bench('read_colfile + sum', from_colfile, nrows, 5)
+
+def bench_init(nrows=200000):
+    '''
+    Creating Stock instances: setting each field through its validator
+    versus the generated __init__ with inlined checks
+    '''
+    def setattr_stock(name, shares, price):
+        self = Stock.__new__(Stock)
+        self.name = name
+        self.shares = shares
+        self.price = price
+        return self
+
+    rows = [ ('GOOG', n, 490.1) for n in range(nrows) ]
+    bench('Stock (descriptors)', lambda: [ setattr_stock(*row) for row in rows ], nrows)
+    bench('Stock (inlined checks)', lambda: [ Stock(*row) for row in rows ], nrows)
+
+def bench_from_rows(nrows=200000):
+    '''
+    Converting rows one at a time with from_row versus all at once with from_rows
+    '''
+    rows = [ ('GOOG', str(n), '490.1') for n in range(nrows) ]
+    bench('Stock.from_row', lambda: [ Stock.from_row(row) for row in rows ], nrows)
+    bench('Stock.from_rows', lambda: Stock.from_rows(rows), nrows)
+    bench('Stock.from_rows (columnar)', lambda: Stock.from_rows(rows, columnar=True), nrows)
+
+def bench_structarray(nrows=200000):
+    '''
+    Memory use and iteration: a list of Stock instances versus a StructureArray
+    '''
+    import tracemalloc
+    from structly import StructureArray
+    rows = [ ('GOOG' if n % 2 else 'AA', str(n), '490.1') for n in range(nrows) ]
+    for label, make in [('list of Stock', Stock.from_rows),
+                        ('StructureArray', lambda rows: StructureArray.from_rows(Stock, rows))]:
+        tracemalloc.start()
+        data = make(rows)
+        print('%-30s %8.1f MB' % (label, tracemalloc.get_traced_memory()[0] / 1e6))
+        tracemalloc.stop()
+        bench(label + ' sum(cost)', lambda: sum(s.cost for s in data), nrows)
+
+if __name__ == '__main__':
+    bench_converters()
+    bench_where()
+    bench_compressed()
+    bench_errors()
+    bench_memo()
+    bench_sample()
+    bench_many()
+    bench_dat()
+    bench_write()
+    bench_colfile()
+    bench_init()
+    bench_from_rows()
+    bench_structarray()
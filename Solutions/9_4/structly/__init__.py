@@ -1,9 +1,27 @@
 # structly/__init__.py
 
 from .structure import *
+from .structarray import *
 from .reader import *
+from .colreader import *
+from .datreader import *
+from .writer import *
+from .colfile import *
+from .cache import *
+from .rowindex import *
+from .sample import *
+from .aioreader import *
 from .tableformat import *
 
 __all__ = [ *structure.__all__,
+            *structarray.__all__,
             *reader.__all__,
+            *colreader.__all__,
+            *datreader.__all__,
+            *writer.__all__,
+            *colfile.__all__,
+            *cache.__all__,
+            *rowindex.__all__,
+            *sample.__all__,
+            *aioreader.__all__,
             *tableformat.__all__ ]
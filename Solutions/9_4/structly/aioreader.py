@@ -0,0 +1,108 @@
+# aioreader.py
+#
+# Async versions of the iter_csv_as_* readers.  Data from an asyncio
+# StreamReader is parsed and converted a block at a time on the event
+# loop.  Files are read with the regular readers on a thread of the
+# loop's default executor, a batch of records at a time, so neither file
+# I/O nor conversion blocks the loop.
+
+__all__ = [ 'aiter_csv_as_dicts',
+            'aiter_csv_as_instances' ]
+
+import asyncio
+import codecs
+import csv
+import io
+import os
+from itertools import islice
+
+from .reader import (iter_records, iter_convert, check_errors, bad_row, bad_row_summary,
+                     dict_converter, instance_converter, ErrorReport)
+
+_BLOCK_SIZE = 1 << 16
+
+async def _stream_blocks(stream, encoding):
+    '''
+    Generate blocks of text from a StreamReader.  Each block ends on a
+    line end that is not inside a quoted field.
+    '''
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ''
+    while True:
+        data = await stream.read(_BLOCK_SIZE)
+        text = pending + decoder.decode(data, final=not data)
+        if not data:
+            if text:
+                yield text
+            break
+        end = text.rfind('\n') + 1
+        if end and text.count('"', 0, end) % 2 == 0:
+            yield text[:end]
+            text = text[end:]
+        pending = text
+
+async def _aiter_stream(stream, make_converter, spec, *, headers=None, errors='warn',
+                        encoding='utf-8', **options):
+    converter = fallback = None
+    rowbase = 0
+    nbad = 0
+    async for block in _stream_blocks(stream, encoding):
+        rows = csv.reader(io.StringIO(block, newline=''))
+        if converter is None:
+            if headers is None:
+                headers = next(rows, None)
+                if headers is None:
+                    continue
+            converter = make_converter(headers, spec, **options)
+            if errors == 'fill':
+                fallback = make_converter(headers, spec, fill=True, **options)
+        rows = list(rows)
+        report = ErrorReport(limit=None)
+        records = list(iter_convert(rows, converter, headers, errors=report, fallback=fallback))
+        for rowno, row, reason in report.rows:
+            nbad += 1
+            bad_row(errors, nbad, rowbase + rowno, row, ValueError(reason))
+        rowbase += len(rows)
+        for record in records:
+            yield record
+    bad_row_summary(errors, nbad)
+
+async def _aiter_file(filename, make_converter, spec, *, batch_size=1000, **options):
+    loop = asyncio.get_running_loop()
+    records = iter_records(filename, make_converter, spec, **options)
+    while True:
+        batch = await loop.run_in_executor(None, list, islice(records, batch_size))
+        if not batch:
+            break
+        for record in batch:
+            yield record
+
+def aiter_records(source, make_converter, spec, *, errors='warn', batch_size=1000, **options):
+    '''
+    Asynchronously generate records from source, which is either an
+    asyncio StreamReader or the name of a file
+    '''
+    check_errors(errors)
+    if isinstance(source, (str, os.PathLike)):
+        return _aiter_file(source, make_converter, spec, errors=errors, batch_size=batch_size,
+                           **options)
+    return _aiter_stream(source, make_converter, spec, errors=errors, **options)
+
+def aiter_csv_as_dicts(source, types, *, headers=None, columns=None, where=None, errors='warn',
+                       memo=None, batch_size=1000):
+    '''
+    Asynchronously generate dictionaries from CSV data in source, an
+    asyncio StreamReader (of UTF-8 bytes) or a filename.  Files are read
+    batch_size records at a time on a thread of the loop's default
+    executor.  The other arguments are as for read_csv_as_dicts.
+    '''
+    return aiter_records(source, dict_converter, types, headers=headers, errors=errors,
+                         batch_size=batch_size, columns=columns, where=where, memo=memo)
+
+def aiter_csv_as_instances(source, cls, *, headers=None, columns=None, where=None,
+                           errors='warn', memo=None, batch_size=1000):
+    '''
+    Asynchronously generate instances from CSV data in source (see aiter_csv_as_dicts)
+    '''
+    return aiter_records(source, instance_converter, cls, headers=headers, errors=errors,
+                         batch_size=batch_size, columns=columns, where=where, memo=memo)
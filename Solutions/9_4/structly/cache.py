@@ -0,0 +1,177 @@
+# cache.py
+
+__all__ = [ 'ParseCache' ]
+
+import hashlib
+import os
+
+from . import reader, colreader
+from .colfile import write_colfile, read_colfile
+from .colreader import DataCollection, DictColumn, column_from_values
+from .structure import projected_structure
+
+def _name(obj):
+    '''
+    Stable name for a type conversion function or class, or None if it has
+    no importable name (a lambda or a function defined inside another one)
+    '''
+    qualname = getattr(obj, '__qualname__', None)
+    if qualname is None or '<' in qualname:
+        return None
+    return f'{obj.__module__}.{qualname}'
+
+def _schema(spec):
+    if isinstance(spec, type):
+        validators = [ type(getattr(spec, name)).__name__ for name in spec._fields ]
+        names = [ _name(spec), *spec._fields, *validators ]
+    else:
+        names = [ _name(func) for func in spec ]
+    return None if None in names else names
+
+def _values(column):
+    return column.decode() if isinstance(column, DictColumn) else column
+
+class ParseCache:
+    '''
+    On-disk cache of parsed CSV files.  Snapshots are column files (see
+    colfile.py) keyed on the file's path, size and modification time
+    plus the schema used to read it.  Data that a column file can't hold
+    is not cached.  The least recently used snapshots are evicted once
+    the cache grows past max_bytes.
+    '''
+    def __init__(self, directory, max_bytes=256 << 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, kind, filename, spec, options):
+        schema = _schema(spec)
+        if schema is None:
+            return None
+        st = os.stat(filename)
+        key = repr((kind, os.path.abspath(filename), st.st_size, st.st_mtime_ns,
+                    schema, sorted(options.items())))
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + '.snap')
+
+    def _load(self, path):
+        try:
+            snapshot = read_colfile(path)
+        except (OSError, ValueError, TypeError):
+            # Missing, truncated or not a column file
+            return None
+        os.utime(path)
+        self.hits += 1
+        return snapshot
+
+    def _store(self, path, names, columns):
+        tmpname = f'{path}.{os.getpid()}.tmp'
+        try:
+            write_colfile(tmpname, DataCollection(dict(zip(names, columns))))
+        except TypeError:
+            # Values a column file can't hold (raised before anything is written)
+            return
+        os.replace(tmpname, path)
+        self._evict()
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.snap'):
+                path = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, path))
+        return sorted(entries)
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except (FileNotFoundError, PermissionError):
+                # Gone already, or still mapped by a reader (on Windows)
+                pass
+            total -= size
+
+    def read_csv_as_dicts(self, filename, types, *, headers=None, columns=None):
+        '''
+        Cached version of read_csv_as_dicts()
+        '''
+        options = dict(headers=headers, columns=columns)
+        path = self._path('dicts', filename, types, options)
+        snapshot = path and self._load(path)
+        if snapshot is not None:
+            with snapshot:
+                names, data = snapshot.column_names, snapshot.column_data
+                return [ dict(zip(names, row)) for row in zip(*map(_values, data)) ]
+
+        records = reader.read_csv_as_dicts(filename, types, **options)
+        if path:
+            self.misses += 1
+            names = list(records[0]) if records else []
+            data = [ column_from_values([ rec[name] for rec in records ]) for name in names ]
+            self._store(path, names, data)
+        return records
+
+    def read_csv_as_instances(self, filename, cls, *, headers=None, columns=None):
+        '''
+        Cached version of read_csv_as_instances()
+        '''
+        options = dict(headers=headers, columns=columns)
+        path = self._path('instances', filename, cls, options)
+        snapshot = path and self._load(path)
+        if snapshot is not None:
+            with snapshot:
+                names, data = snapshot.column_names, snapshot.column_data
+                if columns is not None:
+                    cls = projected_structure(cls, tuple(names))
+                return [ cls(*row) for row in zip(*map(_values, data)) ]
+
+        records = reader.read_csv_as_instances(filename, cls, **options)
+        if path:
+            self.misses += 1
+            names = records[0]._fields if records else ()
+            data = [ column_from_values(values) for values in zip(*records) ]
+            self._store(path, names, data)
+        return records
+
+    def read_csv_as_columns(self, filename, types, *, headers=None, columns=None):
+        '''
+        Cached version of read_csv_as_columns()
+        '''
+        options = dict(headers=headers, columns=columns)
+        path = self._path('columns', filename, types, options)
+        snapshot = path and self._load(path)
+        if snapshot is not None:
+            # Returned as mapped, without copying the columns
+            return snapshot
+
+        collection = colreader.read_csv_as_columns(filename, types, **options)
+        if path:
+            self.misses += 1
+            self._store(path, collection.column_names, collection.column_data)
+        return collection
+
+    def stats(self):
+        '''
+        Return a dict of cache statistics
+        '''
+        entries = self._entries()
+        return { 'hits': self.hits,
+                 'misses': self.misses,
+                 'evictions': self.evictions,
+                 'entries': len(entries),
+                 'bytes': sum(size for _, size, _ in entries) }
+
+    def clear(self):
+        for _, _, path in self._entries():
+            os.remove(path)
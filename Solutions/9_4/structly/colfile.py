@@ -0,0 +1,247 @@
+# colfile.py
+#
+# A binary file format holding records as typed columns.
+#
+#   magic      8 bytes   b'STRUCTLY'
+#   size       8 bytes   little-endian length of the header
+#   header     JSON      { "nrows": n, "columns": [ column, ... ] }
+#   buffers              column data, each aligned on 8 bytes
+#
+# Each column in the header has a name, a kind and a list of [offset,
+# size] buffers (offsets are from the start of the buffers):
+#
+#   'q', 'd'   int or float values            [values]
+#   'q?', 'd?' values with missing values     [values, validity bitmap]
+#   'str'      dictionary-encoded strings     [codes ('I'), offsets ('q'), utf-8 data,
+#                                              codes of None ('q')]
+#   'json'     other None/bool/int/float/str  [JSON list]
+#
+# Columns holding anything else can't be written.  Numbers are stored
+# little-endian whatever the machine writing them.
+#
+# Files are read through mmap.  Numeric columns are memoryviews cast
+# straight onto the map (on little-endian machines), so opening a file
+# copies nothing but the distinct strings, and rows are only built when
+# they are looked at.
+
+__all__ = [ 'write_colfile', 'read_colfile', 'ColumnFile' ]
+
+import json
+import mmap
+import sys
+from array import array
+from copy import copy
+from itertools import accumulate
+
+from .colreader import DataCollection, DictColumn, NullableColumn, column_from_values
+from .structure import Structure
+
+MAGIC = b'STRUCTLY'
+
+# Buffer formats of 8-byte numbers stored as 'q' or 'd' columns
+_native = '@=<' if sys.byteorder == 'little' else '@=>'
+_formats = { 'q': 'q', 'l': 'q', 'd': 'd' }
+
+_json_types = { type(None), bool, int, float, str }
+
+def _pad(size):
+    return -size % 8
+
+def _little(buf, typecode):
+    '''
+    Return a buffer of typecode items in little-endian order
+    '''
+    if sys.byteorder == 'little':
+        return buf
+    buf = array(typecode, bytes(buf))
+    buf.byteswap()
+    return buf
+
+def _cast(buf, typecode):
+    '''
+    Return the little-endian items in buf, as a view if the machine allows
+    '''
+    if sys.byteorder == 'little':
+        return buf.cast(typecode)
+    return _little(buf, typecode)
+
+def _numeric(column):
+    '''
+    Return the kind and a flat view of a column of 8-byte numbers in any
+    object supporting the buffer protocol (array, memoryview, numpy
+    array), or None for other columns
+    '''
+    try:
+        view = memoryview(column)
+    except TypeError:
+        return None
+    fmt = view.format[1:] if view.format[:1] in _native else view.format
+    if view.ndim != 1 or not view.c_contiguous or view.itemsize != 8 or fmt not in _formats:
+        return None
+    return _formats[fmt], view
+
+def _buffers(column):
+    '''
+    Return the kind of a column and the buffers holding it
+    '''
+    if isinstance(column, NullableColumn):
+        return (column.typecode + '?', [_little(column.values, column.typecode), column.validity],
+                column.null_count)
+    if hasattr(column, 'mask'):
+        # numpy masked array
+        column = column_from_values(column.tolist())
+        if isinstance(column, NullableColumn):
+            return _buffers(column)
+    numeric = _numeric(column)
+    if numeric:
+        kind, view = numeric
+        return kind, [_little(view, kind)], 0
+    if not isinstance(column, DictColumn):
+        values = list(column)
+        kinds = set(map(type, values))
+        if kinds <= { str, type(None) }:
+            column = DictColumn()
+            for value in values:
+                column.append(value)
+        else:
+            column = column_from_values(values)
+            if not isinstance(column, list):
+                return _buffers(column)
+            if not kinds <= _json_types:
+                names = ', '.join(sorted(kind.__name__ for kind in kinds - _json_types))
+                raise TypeError(f"can't store values of type {names} in a column file")
+            return 'json', [json.dumps(values).encode('utf-8')], values.count(None)
+    if not set(map(type, column.values)) <= { str, type(None) }:
+        return _buffers(list(column))
+    data = [ b'' if value is None else value.encode('utf-8') for value in column.values ]
+    offsets = array('q', accumulate(map(len, data), initial=0))
+    nulls = array('q', (code for code, value in enumerate(column.values) if value is None))
+    nullrows = sum(map(set(nulls).__contains__, column.codes))
+    return ('str', [_little(array('I', column.codes), 'I'), _little(offsets, 'q'), b''.join(data),
+                    _little(nulls, 'q')], nullrows)
+
+def write_colfile(filename, records):
+    '''
+    Write records to a column file.  records is a list of instances of a
+    Structure, a list of dicts or a DataCollection.
+    '''
+    if isinstance(records, DataCollection):
+        names, columns = records.column_names, records.column_data
+    elif records and isinstance(records[0], Structure):
+        names = records[0]._fields
+        columns = [ column_from_values(values) for values in zip(*records) ]
+    elif records:
+        names = list(records[0])
+        columns = [ column_from_values([ record[name] for record in records ]) for name in names ]
+    else:
+        names, columns = [], []
+
+    header = { 'nrows': len(records), 'columns': [] }
+    buffers = []
+    offset = 0
+    for name, column in zip(names, columns):
+        kind, data, nulls = _buffers(column)
+        spans = []
+        for buf in data:
+            size = memoryview(buf).nbytes
+            spans.append([offset, size])
+            buffers.append(buf)
+            offset += size + _pad(size)
+        header['columns'].append({ 'name': name, 'kind': kind, 'buffers': spans, 'nulls': nulls })
+
+    head = json.dumps(header).encode('utf-8')
+    head += b' ' * _pad(len(head))
+    with open(filename, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(head).to_bytes(8, 'little'))
+        f.write(head)
+        for buf in buffers:
+            size = memoryview(buf).nbytes
+            f.write(buf)
+            f.write(b'\0' * _pad(size))
+
+class ColumnFile(DataCollection):
+    '''
+    Memory-mapped column file.  It is a DataCollection whose rows are
+    dicts, or instances of cls if given.  Rows are only built when they
+    are looked at.
+    '''
+    def __init__(self, filename, cls=None):
+        with open(filename, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        if view[:8] != MAGIC:
+            view.release()
+            self._map.close()
+            raise ValueError(f'{filename} is not a column file')
+        size = int.from_bytes(view[8:16], 'little')
+        header = json.loads(bytes(view[16:16 + size]))
+        base = 16 + size
+
+        self.cls = cls
+        columns = { }
+        for col in header['columns']:
+            bufs = [ view[base + offset:base + offset + size] for offset, size in col['buffers'] ]
+            columns[col['name']] = self._column(col['kind'], bufs, col['nulls'])
+        super().__init__(columns, header['nrows'])
+
+    def _column(self, kind, bufs, nulls):
+        if kind in ('q', 'd'):
+            return _cast(bufs[0], kind)
+        if kind in ('q?', 'd?'):
+            column = NullableColumn(kind[0])
+            column.values = _cast(bufs[0], kind[0])
+            column.validity = bufs[1]
+            column.null_count = nulls
+            return column
+        if kind == 'str':
+            offsets = _cast(bufs[1], 'q')
+            data = bytes(bufs[2])
+            values = [ data[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:]) ]
+            for code in _cast(bufs[3], 'q'):
+                values[code] = None
+            return DictColumn(values, _cast(bufs[0], 'I'))
+        if kind == 'json':
+            return json.loads(bytes(bufs[0]))
+        raise ValueError(f'unknown column kind {kind!r}')
+
+    def __len__(self):
+        return self.nrows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            # A view of the same map whose rows are still of cls
+            rows = copy(self)
+            rows.column_data = [ col[index] for col in self.column_data ]
+            rows.nrows = len(range(self.nrows)[index])
+            return rows
+        if not -self.nrows <= index < self.nrows:
+            # A file without columns has no column to raise this
+            raise IndexError('row index out of range')
+        if self.cls is None:
+            return super().__getitem__(index)
+        return self.cls(*(col[index] for col in self.column_data))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        '''
+        Release the columns and unmap the file
+        '''
+        self.column_data = []
+        try:
+            self._map.close()
+        except BufferError:
+            # A caller still holds a column; the map is freed with it
+            pass
+
+def read_colfile(filename, cls=None):
+    '''
+    Open a column file written by write_colfile.  Rows are dicts, or
+    instances of cls (a Structure class) if given.
+    '''
+    return ColumnFile(filename, cls)
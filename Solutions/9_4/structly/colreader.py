@@ -0,0 +1,247 @@
+# colreader.py
+
+__all__ = [ 'read_csv_as_columns', 'nullable' ]
+
+import collections
+import sys
+from array import array
+from itertools import chain, compress
+
+from .reader import (open_csv, csv_rows, select_columns, where_columns, convert_fields,
+                     append_converter, iter_convert, check_errors)
+
+class DataCollection(collections.abc.Sequence):
+    def __init__(self, columns, nrows=0):
+        self.column_names = list(columns)
+        self.column_data = list(columns.values())
+        # The number of rows if there are no columns to count them in
+        self.nrows = nrows
+
+    def __len__(self):
+        return len(self.column_data[0]) if self.column_data else self.nrows
+
+    def __getitem__(self, index):
+        if not self.column_data:
+            rows = range(self.nrows)[index]
+            return DataCollection({ }, len(rows)) if isinstance(index, slice) else { }
+        if isinstance(index, slice):
+            return DataCollection(dict(zip(self.column_names,
+                                           (col[index] for col in self.column_data))))
+        return dict(zip(self.column_names,
+                        (col[index] for col in self.column_data)))
+
+    def column(self, name):
+        return self.column_data[self.column_names.index(name)]
+
+class DictColumn(collections.abc.Sequence):
+    '''
+    Dictionary-encoded column.  Each distinct value is stored once and
+    rows hold a small integer code referring to it.
+    '''
+    def __init__(self, values=None, codes=None, index=None):
+        self.values = [] if values is None else values
+        self.codes = array('I') if codes is None else codes
+        if index is None:
+            index = { value: code for code, value in enumerate(self.values) }
+        self.index = index
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return DictColumn(self.values, self.codes[index], self.index)
+        return self.values[self.codes[index]]
+
+    def append(self, value):
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def decode(self):
+        '''
+        Return the column as a plain list
+        '''
+        return list(map(self.values.__getitem__, self.codes))
+
+    def __reduce__(self):
+        # The index is rebuilt from values, so it isn't pickled
+        return DictColumn, (self.values, self.codes)
+
+class nullable:
+    '''
+    Type conversion for a column with missing (empty) values, which are
+    converted to None.  For example, nullable(int).
+    '''
+    def __init__(self, func):
+        self.func = func
+
+    def __repr__(self):
+        return f'nullable({self.func.__name__})'
+
+    def __call__(self, value):
+        return self.func(value) if value else None
+
+# Bits of each byte value, least significant first
+_bits = [ tuple((byte >> n) & 1 for n in range(8)) for byte in range(256) ]
+
+class NullableColumn(collections.abc.Sequence):
+    '''
+    Typed array column with a validity bitmap.  A missing value is stored
+    as 0 in the array with its bit in the bitmap cleared.  The aggregation
+    methods skip missing values.
+    '''
+    def __init__(self, typecode, values=()):
+        self.typecode = typecode
+        self.values = array(typecode)
+        self.validity = bytearray()
+        self.null_count = 0
+        for value in values:
+            self.append(value)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return NullableColumn(self.typecode, map(self.__getitem__, range(len(self))[index]))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('index out of range')
+        return self.values[index] if self.is_valid(index) else None
+
+    def __reduce__(self):
+        return NullableColumn, (self.typecode, list(self))
+
+    def is_valid(self, index):
+        return (self.validity[index >> 3] >> (index & 7)) & 1
+
+    def append(self, value):
+        n = len(self.values)
+        if n & 7 == 0:
+            self.validity.append(0)
+        if value is None:
+            self.values.append(0)
+            self.null_count += 1
+        else:
+            self.values.append(value)
+            self.validity[n >> 3] |= 1 << (n & 7)
+
+    def valid_values(self):
+        '''
+        Iterate over the values that are not missing
+        '''
+        if not self.null_count:
+            return iter(self.values)
+        return compress(self.values, chain.from_iterable(map(_bits.__getitem__, self.validity)))
+
+    def count(self):
+        return len(self) - self.null_count
+
+    def sum(self):
+        # Missing values are stored as 0, so they can be summed
+        return sum(self.values)
+
+    def mean(self):
+        return self.sum() / self.count() if self.count() else None
+
+    def min(self):
+        return min(self.valid_values(), default=None)
+
+    def max(self):
+        return max(self.valid_values(), default=None)
+
+# Storage used for each kind of converter.  Anything else goes in a list.
+_typecodes = { int: 'q', float: 'd' }
+_strtypes = { str, sys.intern }
+
+def make_column(func):
+    if isinstance(func, nullable):
+        if func.func in _typecodes:
+            return NullableColumn(_typecodes[func.func])
+        return make_column(func.func)
+    elif func in _typecodes:
+        return array(_typecodes[func])
+    elif func in _strtypes:
+        return DictColumn()
+    else:
+        return []
+
+def column_from_values(values):
+    '''
+    Store an existing sequence of values in the most compact column type
+    '''
+    kinds = set(map(type, values))
+    if len(kinds) == 2 and type(None) in kinds:
+        kind = (kinds - { type(None) }).pop()
+        if kind in _typecodes:
+            return NullableColumn(_typecodes[kind], values)
+    elif kinds == { int }:
+        try:
+            return array('q', values)
+        except OverflowError:
+            pass
+    elif kinds == { float }:
+        return array('d', values)
+    elif kinds == { str }:
+        column = DictColumn()
+        collections.deque(map(column.append, values), maxlen=0)
+        return column
+    return list(values)
+
+def to_numpy(column):
+    import numpy
+    if isinstance(column, array):
+        return numpy.frombuffer(column, dtype=column.typecode)
+    if isinstance(column, memoryview):
+        return numpy.frombuffer(column, dtype=column.format)
+    if isinstance(column, NullableColumn):
+        valid = numpy.unpackbits(numpy.frombuffer(column.validity, dtype='B'),
+                                 bitorder='little')[:len(column)]
+        return numpy.ma.masked_array(to_numpy(column.values), mask=~valid.astype(bool))
+    return column
+
+def csv_as_columns(lines, types, *, headers=None, columns=None, where=None, errors='warn',
+                   numpy=False, memo=None, split=csv_rows):
+    rows, headers = split(lines, headers)
+    indices = select_columns(headers, columns)
+    where_indices = select_columns(headers, where_columns(where))
+    data = { headers[n]: make_column(types[n]) for n in indices if n < len(types) }
+    appends = [ col.append for col in data.values() ]
+
+    def fields(indices, fill=False):
+        return convert_fields(types, indices, fill=fill, memo=memo, names=headers)
+
+    converter = append_converter(fields(indices), appends, where=where,
+                                 where_fields=fields(where_indices))
+    fallback = None
+    if errors == 'fill':
+        fallback = append_converter(fields(indices, True), appends, where=where,
+                                    where_fields=fields(where_indices, True))
+    records = iter_convert(rows, converter, headers, errors=check_errors(errors), fallback=fallback)
+    if data:
+        collections.deque(records, maxlen=0)
+        nrows = 0
+    else:
+        # Nothing is appended, so the rows are only counted
+        nrows = sum(1 for _ in records)
+    if numpy:
+        data = { name: to_numpy(col) for name, col in data.items() }
+    return DataCollection(data, nrows)
+
+def read_csv_as_columns(filename, types, *, headers=None, columns=None, where=None,
+                        errors='warn', numpy=False, threaded=False, memo=None):
+    '''
+    Read CSV data into columns.  int and float columns are stored in
+    typed arrays (NumPy arrays if numpy is true) and str columns are
+    dictionary-encoded.  columns optionally selects a subset of the
+    columns by name or index, where is an optional row filter and errors
+    is the bad row policy (see read_csv_as_dicts).  Compressed files and
+    memo are handled as by read_csv_as_dicts.
+    '''
+    with open_csv(filename, threaded=threaded) as file:
+        return csv_as_columns(file, types, headers=headers, columns=columns, where=where,
+                              errors=errors, numpy=numpy, memo=memo)
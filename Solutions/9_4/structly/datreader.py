@@ -0,0 +1,42 @@
+# datreader.py
+#
+# Readers for files of whitespace-delimited fields such as portfolio.dat.
+# Lines are split with str.split() and go through the same compiled
+# converters and error policies as the CSV readers.  .dat files have no
+# header line, so the column names are given as headers (or taken from
+# the fields of a Structure class).
+
+__all__ = [ 'read_dat_as_dicts',
+            'read_dat_as_instances',
+            'read_dat_as_columns' ]
+
+from .reader import read_records, dict_converter, instance_converter, dat_rows, open_csv
+from .colreader import csv_as_columns
+
+def read_dat_as_dicts(filename, types, headers, *, columns=None, where=None, errors='warn',
+                      threaded=False, memo=None):
+    '''
+    Read whitespace-delimited data into a list of dictionaries.  The other
+    arguments are as for read_csv_as_dicts.
+    '''
+    return read_records(filename, dict_converter, types, headers=headers, errors=errors,
+                        threaded=threaded, split=dat_rows, columns=columns, where=where,
+                        memo=memo)
+
+def read_dat_as_instances(filename, cls, *, columns=None, where=None, errors='warn',
+                          threaded=False, memo=None):
+    '''
+    Read whitespace-delimited data into a list of instances of cls
+    '''
+    return read_records(filename, instance_converter, cls, headers=cls._fields, errors=errors,
+                        threaded=threaded, split=dat_rows, columns=columns, where=where,
+                        memo=memo)
+
+def read_dat_as_columns(filename, types, headers, *, columns=None, where=None, errors='warn',
+                        numpy=False, threaded=False, memo=None):
+    '''
+    Read whitespace-delimited data into columns (see read_csv_as_columns)
+    '''
+    with open_csv(filename, threaded=threaded) as file:
+        return csv_as_columns(file, types, headers=headers, columns=columns, where=where,
+                              errors=errors, numpy=numpy, memo=memo, split=dat_rows)
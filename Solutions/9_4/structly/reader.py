@@ -1,43 +1,818 @@
 # reader.py
 
+import bz2
 import csv
+import gzip
+import io
 import logging
+import lzma
+import mmap
+import os
+import pickle
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
+from inspect import signature
+from itertools import islice
+
+__all__ = [ 'read_csv_as_dicts',
+            'read_csv_as_instances',
+            'iter_csv_as_dicts',
+            'iter_csv_as_instances',
+            'read_csv_in_batches',
+            'read_many',
+            'ErrorReport',
+            'ConversionCache' ]
+
+from .structure import Structure, projected_structure
 
 log = logging.getLogger(__name__)
 
-def convert_csv(lines, converter, *, headers=None):
+# Returned by a converter for a row that fails its where filter
+REJECT = object()
+
+# -- Bad rows
+#
+# What happens to a row that fails conversion is set by an error policy:
+#
+#   'warn'  - skip the row and log a warning (the default).  Only the first
+#             WARN_LIMIT bad rows are logged, followed by a count at the end.
+#   'skip'  - skip the row silently
+#   'raise' - raise ValueError
+#   'fill'  - replace fields that fail to convert with a default (the
+#             type called with no arguments, e.g. 0 for int, or None).
+#             Rows that still fail are handled as for 'warn'.
+#   ErrorReport instance - skip the row and record it in the report
+
+WARN_LIMIT = 10
+
+_policies = { 'warn', 'skip', 'raise', 'fill' }
+
+class ErrorReport:
+    '''
+    Bounded record of bad rows.  count is the total number seen and rows
+    holds (rowno, row, reason) for the first limit of them.
+    '''
+    def __init__(self, limit=100):
+        self.limit = limit
+        self.count = 0
+        self.rows = []
+
+    def __repr__(self):
+        return f'ErrorReport(count={self.count})'
+
+    def add(self, rowno, row, reason):
+        self.count += 1
+        if self.limit is None or len(self.rows) < self.limit:
+            self.rows.append((rowno, row, str(reason)))
+
+def check_errors(errors):
+    if errors not in _policies and not isinstance(errors, ErrorReport):
+        raise ValueError(f'Unknown error policy {errors!r}')
+    return errors
+
+def bad_row(errors, count, rowno, row, reason):
+    '''
+    Apply an error policy to the count-th bad row seen in a read
+    '''
+    if errors == 'warn' or errors == 'fill':
+        if count <= WARN_LIMIT:
+            log.warning('Row %s: Bad row: %s', rowno, row)
+            log.debug('Row %s: Reason: %s', rowno, reason)
+    elif errors == 'raise':
+        raise ValueError(f'Row {rowno}: Bad row: {row}') from reason
+    elif isinstance(errors, ErrorReport):
+        errors.add(rowno, row, reason)
+
+def bad_row_summary(errors, count):
+    if (errors == 'warn' or errors == 'fill') and count > WARN_LIMIT:
+        log.warning('%d bad rows (only the first %d logged)', count, WARN_LIMIT)
+
+def iter_convert(rows, converter, headers, *, errors='warn', fallback=None):
+    '''
+    Generate converted records from rows.  Rows that fail conversion are
+    retried with fallback (if given) and then handled by the errors policy.
+    '''
+    nbad = 0
+    try:
+        for rowno, row in enumerate(rows, start=1):
+            if not row:
+                continue
+            try:
+                record = converter(headers, row)
+            except ValueError:
+                try:
+                    if fallback is None:
+                        raise
+                    record = fallback(headers, row)
+                except ValueError as e:
+                    nbad += 1
+                    bad_row(errors, nbad, rowno, row, e)
+                    continue
+            if record is not REJECT:
+                yield record
+    finally:
+        bad_row_summary(errors, nbad)
+
+_BATCH_SIZE = 10000
+
+def convert_list(rows, converter, headers, *, errors='warn', fallback=None, where=False):
+    '''
+    Convert rows into a list of records, like list(iter_convert(...)).
+    Rows are converted a batch at a time with map(), so there is no
+    per-row Python code around the converter.  Only a batch holding a
+    bad row is redone with iter_convert.  where says whether the
+    converter can reject rows.
+    '''
+    records = []
+    convert = partial(converter, headers)
+    batch_convert = getattr(converter, 'batch', None)
+    rows = iter(rows)
+    rowbase = 0
+    nbad = 0
+    while True:
+        batch = list(islice(rows, _BATCH_SIZE))
+        if not batch:
+            break
+        size = len(records)
+        try:
+            # Blank rows are dropped by filter()
+            if batch_convert:
+                records.extend(batch_convert(headers, batch))
+            else:
+                records.extend(map(convert, filter(None, batch)))
+        except ValueError:
+            del records[size:]
+            report = ErrorReport(limit=None)
+            records.extend(iter_convert(batch, converter, headers, errors=report,
+                                        fallback=fallback))
+            for rowno, row, reason in report.rows:
+                nbad += 1
+                bad_row(errors, nbad, rowbase + rowno, row, ValueError(reason))
+        rowbase += len(batch)
+    bad_row_summary(errors, nbad)
+    if where and not batch_convert:
+        records = [ record for record in records if record is not REJECT ]
+    return records
+
+def convert_rows(rows, converter, headers, *, errors='warn', fallback=None, lazy=False):
+    records = iter_convert(rows, converter, headers, errors=check_errors(errors), fallback=fallback)
+    return records if lazy else list(records)
+
+def csv_rows(lines, headers=None):
+    '''
+    Return a row iterator and the headers (read from the first row if not given)
+    '''
     rows = csv.reader(lines)
     if headers is None:
         headers = next(rows)
+    return rows, headers
 
-    records = []
-    for rowno, row in enumerate(rows, start=1):
+def dat_rows(lines, headers=None):
+    '''
+    Like csv_rows, but for lines of whitespace-delimited fields
+    '''
+    rows = map(str.split, lines)
+    if headers is None:
+        headers = next(rows)
+    return rows, headers
+
+def convert_csv(lines, converter, *, headers=None, lazy=False):
+    rows, headers = csv_rows(lines, headers)
+    return convert_rows(rows, converter, headers, lazy=lazy)
+
+# -- Compiled row converters
+#
+# Rather than looping over zip(headers, types, row) for every row, source
+# code for a converter specialized to the schema is generated and exec'd
+# (the same trick as Structure.create_init).  The row is unpacked into
+# locals and each conversion function is called directly.  A short row
+# raises ValueError and is reported as a bad row; extra fields are ignored.
+#
+# Converters can be restricted to a subset of the columns.  Unused fields
+# are unpacked into a throwaway name and never converted.
+
+def select_columns(names, columns):
+    '''
+    Resolve a list of column names and/or indices to a tuple of indices
+    '''
+    if columns is None:
+        return tuple(range(len(names)))
+    positions = range(len(names))
+    try:
+        # Indices are normalized, so negative indices count from the end
+        return tuple(names.index(col) if isinstance(col, str) else positions[col]
+                     for col in columns)
+    except (ValueError, IndexError):
+        raise ValueError(f'Unknown column in {columns!r}') from None
+
+def _compile_batch(fields, record, width, where, where_fields, env):
+    '''
+    Compile convert.batch(headers, rows), which converts a list of rows
+    with a single list comprehension.  Every non-blank row must have
+    exactly width fields; anything else raises ValueError.
+    '''
+    unpack = ''.join(f'v{n}, ' if n in fields or n in where_fields else '_, '
+                     for n in range(width))
+    # Fields are converted inline, except for those already converted for where
+    value = lambda pos: f'c{pos}' if pos in where_fields else f'f{pos}(v{pos})'
+    code = f'def batch(headers, rows, {", ".join(f"{name}={name}" for name in env)}):\n'
+    code += f'    return [ {record(value)} for {unpack}in filter(None, rows)'
+    if where:
+        code += f' if where({", ".join(f"(c{pos} := f{pos}(v{pos}))" for pos in where_fields)})'
+    code += ' ]\n'
+    locs = { }
+    exec(code, env, locs)
+    return locs['batch']
+
+def _compile_converter(fields, body, *, where=None, where_fields=(), record=None, width=None,
+                       **env):
+    '''
+    Compile a converter.  fields and where_fields are sequences of
+    (position, func) pairs.  Each field is converted into a local
+    c<position> that the lines of body can use.  If a where function is
+    given, it is called with the where_fields right after they are
+    converted and the row is rejected (without converting anything else)
+    if it returns false.
+
+    Instead of body, record can be given: a function returning the
+    expression for the record, given a function returning the expression
+    for the value at a position.  If rows also have a known width, the
+    converter gets a batch attribute for converting many rows at once
+    (see _compile_batch).
+    '''
+    if record is not None:
+        body = [ f'return {record(lambda pos: f"c{pos}")}' ]
+    fields = dict(fields)
+    where_fields = dict(where_fields)
+    used = fields.keys() | where_fields.keys()
+    env.update((f'f{pos}', func) for pos, func in { **fields, **where_fields }.items())
+    if where:
+        env.update(where=where, REJECT=REJECT)
+    args = ', '.join(f'{name}={name}' for name in env)
+    # Plain unpacking of exactly as many fields as are used.  Longer rows
+    # are cut to fit; short rows still fail to unpack (ValueError).
+    nfields = max(used, default=-1) + 1
+    unpack = ''.join(f'v{n}, ' if n in used else '_, ' for n in range(nfields))
+    code = f'def convert(headers, row, {args}):\n'
+    if nfields:
+        code += f'    {unpack}= row if len(row) == {nfields} else row[:{nfields}]\n'
+    if where:
+        for pos in where_fields:
+            code += f'    c{pos} = f{pos}(v{pos})\n'
+        code += f'    if not where({", ".join(f"c{pos}" for pos in where_fields)}):\n'
+        code += f'        return REJECT\n'
+    for pos in fields:
+        if pos not in where_fields:
+            code += f'    c{pos} = f{pos}(v{pos})\n'
+    for line in body or [ 'pass' ]:
+        code += f'    {line}\n'
+    locs = { }
+    exec(code, env, locs)
+    convert = locs['convert']
+    if record is not None and width and nfields <= width:
+        convert.batch = _compile_batch(fields, record, width, where, where_fields, env)
+    return convert
+
+def _fill_func(func, convert):
+    try:
+        default = func()
+    except Exception:
+        default = None
+
+    def fill(value):
         try:
-            records.append(converter(headers, row))
-        except ValueError as e:
-            log.warning('Row %s: Bad row: %s', rowno, row)
-            log.debug('Row %s: Reason: %s', rowno, row)
+            return convert(value)
+        except ValueError:
+            return default
+    return fill
+
+def convert_fields(types, indices, fill=False, memo=None, names=None):
+    fields = []
+    for n in indices:
+        if n < len(types):
+            convert = types[n]
+            if fill:
+                convert = _fill_func(types[n], convert)
+            if memo is not None:
+                convert = memo.wrap(names[n], convert)
+            fields.append((n, convert))
+    return fields
+
+def where_columns(where):
+    '''
+    Return the column names a where function refers to (its argument names)
+    '''
+    return list(signature(where).parameters) if where else []
+
+@lru_cache(maxsize=128)
+def _dict_converter(headers, types, columns, where, fill=False, memo=None):
+    fields = convert_fields(types, select_columns(headers, columns), fill, memo, headers)
+    where_fields = convert_fields(types, select_columns(headers, where_columns(where)),
+                                  fill, memo, headers)
+    def record(value):
+        return '{ ' + ', '.join(f'{headers[n]!r}: {value(n)}' for n, _ in fields) + ' }'
+    return _compile_converter(fields, None, record=record, width=len(headers),
+                              where=where, where_fields=where_fields)
+
+@lru_cache(maxsize=128)
+def _instance_converter(cls, columns, where, fill=False, memo=None):
+    indices = select_columns(cls._fields, columns)
+    fields = convert_fields(cls._types, indices, fill, memo, cls._fields)
+    where_fields = convert_fields(cls._types, select_columns(cls._fields, where_columns(where)),
+                                  fill, memo, cls._fields)
+    width = len(cls._fields)
+    if columns is not None:
+        cls = projected_structure(cls, tuple(cls._fields[n] for n in indices))
+    def record(value):
+        return 'cls(' + ', '.join(value(n) for n, _ in fields) + ')'
+    return _compile_converter(fields, None, record=record, width=width,
+                              where=where, where_fields=where_fields, cls=cls)
+
+def _key(columns):
+    return None if columns is None else tuple(columns)
+
+def dict_converter(headers, types, columns=None, where=None, *, fill=False, memo=None):
+    return _dict_converter(tuple(headers), tuple(types), _key(columns), where, fill, memo)
+
+def instance_converter(headers, cls, columns=None, where=None, *, fill=False, memo=None):
+    return _instance_converter(cls, _key(columns), where, fill, memo)
+
+def append_converter(fields, appends, *, where=None, where_fields=()):
+    '''
+    Make a converter that appends converted fields to columns.  fields is
+    a sequence of (position, func) pairs matching appends.  All fields are
+    converted before anything is appended, so a bad row never leaves the
+    columns with different lengths.
+    '''
+    body = [ f'a{n}(c{pos})' for n, (pos, _) in enumerate(fields) ]
+    return _compile_converter(fields, body, where=where, where_fields=where_fields,
+                              **{ f'a{n}': append for n, append in enumerate(appends) })
+
+def csv_as_dicts(lines, types, *, headers=None, columns=None, where=None, errors='warn',
+                 memo=None, lazy=False):
+    rows, headers = csv_rows(lines, headers)
+    fallback = None
+    if errors == 'fill':
+        fallback = dict_converter(headers, types, columns, where, fill=True, memo=memo)
+    return convert_rows(rows, dict_converter(headers, types, columns, where, memo=memo), headers,
+                        errors=errors, fallback=fallback, lazy=lazy)
+
+def csv_as_instances(lines, cls, *, headers=None, columns=None, where=None, errors='warn',
+                     memo=None, lazy=False):
+    rows, headers = csv_rows(lines, headers)
+    fallback = None
+    if errors == 'fill':
+        fallback = instance_converter(headers, cls, columns, where, fill=True, memo=memo)
+    return convert_rows(rows, instance_converter(headers, cls, columns, where, memo=memo), headers,
+                        errors=errors, fallback=fallback, lazy=lazy)
+
+# -- Conversion memoization
+#
+# Files often repeat the same tokens (dates, route ids, prices) over and
+# over.  A ConversionCache puts a bounded LRU cache in front of the type
+# conversion of each column, so each distinct token is converted once.
+# It only pays off for columns with few distinct values.
+
+class ConversionCache:
+    '''
+    Bounded per-column caches of converted values, holding up to maxsize
+    values for each column.  columns optionally limits caching to the
+    named columns.  Pass one as memo= to the read functions.  Caches are
+    not shared with worker processes (workers=).
+    '''
+    def __init__(self, maxsize=1024, columns=None):
+        self.maxsize = maxsize
+        self.columns = None if columns is None else frozenset(columns)
+        self.caches = { }
+
+    def __repr__(self):
+        return f'ConversionCache(maxsize={self.maxsize})'
+
+    def __getstate__(self):
+        return { **self.__dict__, 'caches': { } }
+
+    def wrap(self, name, func):
+        '''
+        Return func with a cache in front of it for values of column name
+        '''
+        if self.columns is not None and name not in self.columns:
+            return func
+        cached = self.caches.get((name, func))
+        if cached is None:
+            cached = self.caches[name, func] = lru_cache(self.maxsize)(func)
+        return cached
+
+    def stats(self):
+        '''
+        Return { column: { hits, misses, entries, hit_rate } }
+        '''
+        stats = { }
+        for (name, _), cached in self.caches.items():
+            info = cached.cache_info()
+            col = stats.setdefault(name, { 'hits': 0, 'misses': 0, 'entries': 0 })
+            col['hits'] += info.hits
+            col['misses'] += info.misses
+            col['entries'] += info.currsize
+        for col in stats.values():
+            total = col['hits'] + col['misses']
+            col['hit_rate'] = col['hits'] / total if total else 0.0
+        return stats
+
+    def clear(self):
+        for cached in self.caches.values():
+            cached.cache_clear()
+
+# -- Parallel reading
+#
+# The file is cut into byte ranges that always end on a record boundary.
+# A newline only ends a record if an even number of quote characters
+# precede it (an escaped "" counts twice, so the parity still works).
+
+_SCAN_SIZE = 1 << 24
+
+def _count_quotes(mm, start, end):
+    count = 0
+    for pos in range(start, end, _SCAN_SIZE):
+        count += mm[pos:min(pos + _SCAN_SIZE, end)].count(b'"')
+    return count
+
+def next_record(mm, start, pos):
+    '''
+    Return the offset just past the first record boundary at or after pos.
+    start must itself be a record boundary.
+    '''
+    quotes = _count_quotes(mm, start, pos)
+    while True:
+        nl = mm.find(b'\n', pos)
+        if nl < 0:
+            return len(mm)
+        quotes += _count_quotes(mm, pos, nl)
+        pos = nl + 1
+        if quotes % 2 == 0:
+            return pos
+
+def split_ranges(filename, nchunks, *, skip_header=True):
+    '''
+    Split a CSV file into at most nchunks (start, end) byte ranges that
+    are aligned on record boundaries.  Returns (header, ranges) where
+    header holds the raw bytes of the first record (or b'' if skipped).
+    '''
+    with open(filename, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b'', []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            start = next_record(mm, 0, 0) if skip_header else 0
+            header = mm[:start]
+            ranges = []
+            for n in range(1, nchunks + 1):
+                end = size if n == nchunks else max(start, size * n // nchunks)
+                if end < size:
+                    end = next_record(mm, start, end)
+                if end > start:
+                    ranges.append((start, end))
+                    start = end
+    return header, ranges
+
+def decode_text(data):
+    '''
+    Return a text file reading the bytes of CSV records, decoded the same
+    way open() would in text mode
+    '''
+    return io.TextIOWrapper(io.BytesIO(data), newline='')
+
+def parse_range(filename, start, end, make_converter, spec, headers, fill, options):
+    '''
+    Convert the records in the byte range [start, end) of a CSV file.
+    Returns (records, bad, nrows) where bad lists (rowno, row, reason) for
+    the rows that failed conversion, numbered from 1 within the range.
+    '''
+    converter = make_converter(headers, spec, **options)
+    fallback = make_converter(headers, spec, fill=True, **options) if fill else None
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    rows = list(csv.reader(decode_text(data)))
+    report = ErrorReport(limit=None)
+    records = list(iter_convert(rows, converter, headers, errors=report, fallback=fallback))
+    return records, report.rows, len(rows)
+
+def read_parallel(filename, make_converter, spec, *, headers=None, workers=None, errors='warn',
+                  index=None, **options):
+    '''
+    Read a CSV file using a pool of worker processes.  make_converter(headers, spec, **options)
+    is called in each worker to build the row converter, so all of these must
+    be picklable (module-level functions and classes, builtin types, etc.).
+    Records are returned in file order.  If a RowIndex of the file is given,
+    the file is cut on its indexed records instead of being scanned.
+    '''
+    workers = workers or os.cpu_count()
+    nchunks = max(1, min(workers * 4, os.path.getsize(filename) // (1 << 20)))
+    if index is None:
+        header, ranges = split_ranges(filename, nchunks, skip_header=headers is None)
+    else:
+        st = os.stat(filename)
+        if index.stamp != (st.st_size, st.st_mtime_ns):
+            raise ValueError(f'{filename} has changed since its index was built')
+        if index.skip_header != (headers is None):
+            raise ValueError('index must skip the header line exactly when headers is None')
+        header, ranges = index.header, index.split_ranges(nchunks)
+    if headers is None:
+        headers = next(csv.reader(decode_text(header)), [])
+
+    records = []
+    rowbase = 0
+    nbad = 0
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [ pool.submit(parse_range, filename, start, end, make_converter, spec,
+                                headers, errors == 'fill', options)
+                    for start, end in ranges ]
+        for future in futures:
+            chunk, bad, nrows = future.result()
+            records.extend(chunk)
+            for rowno, row, reason in bad:
+                nbad += 1
+                bad_row(errors, nbad, rowbase + rowno, row, ValueError(reason))
+            rowbase += nrows
+    bad_row_summary(errors, nbad)
     return records
 
-def csv_as_dicts(lines, types, *, headers=None):
-    return convert_csv(lines, 
-                       lambda headers, row: { name: func(val) for name, func, val in zip(headers, types, row) })
+# -- Compressed input
+#
+# Compressed files are recognized by their magic bytes, not their name.
+# With threaded=True the decompression runs in a background thread that
+# hands blocks to the parser through a bounded queue.  zlib, bz2 and lzma
+# release the GIL while they work, so decompression and parsing overlap.
+
+_compressors = [ (b'\x1f\x8b', gzip.open),
+                 (b'BZh', bz2.open),
+                 (b'\xfd7zXZ\x00', lzma.open) ]
+
+def _opener(filename):
+    with open(filename, 'rb') as f:
+        magic = f.read(6)
+    for prefix, opener in _compressors:
+        if magic.startswith(prefix):
+            return opener
+    return None
+
+def is_compressed(filename):
+    return _opener(filename) is not None
+
+class ThreadedReader(io.RawIOBase):
+    '''
+    Raw binary stream that reads a file in a background thread
+    '''
+    def __init__(self, file, blocksize=1 << 20, maxblocks=4):
+        self._file = file
+        self._blocksize = blocksize
+        self._blocks = queue.Queue(maxblocks)
+        self._pending = b''
+        self._done = False
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+        self._thread.start()
+
+    def _produce(self):
+        try:
+            while not self._stopped.is_set():
+                block = self._file.read(self._blocksize)
+                self._put(block)
+                if not block:
+                    break
+        except Exception as e:
+            self._put(e)
+
+    def _put(self, item):
+        while not self._stopped.is_set():
+            try:
+                self._blocks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def readable(self):
+        return True
 
-def csv_as_instances(lines, cls, *, headers=None):
-    return convert_csv(lines,
-                       lambda headers, row: cls.from_row(row))
+    def readinto(self, buffer):
+        if not self._pending and not self._done:
+            block = self._blocks.get()
+            if isinstance(block, Exception):
+                raise block
+            self._pending = memoryview(block)
+            self._done = not block
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
 
-def read_csv_as_dicts(filename, types, *, headers=None):
+    def close(self):
+        if not self.closed:
+            self._stopped.set()
+            self._thread.join()
+            self._file.close()
+        super().close()
+
+def open_csv(filename, *, threaded=False):
+    '''
+    Open a CSV file for reading as text.  gzip, bz2 and xz data is
+    detected by its magic bytes and decompressed while reading.
+    '''
+    opener = _opener(filename)
+    if opener is None:
+        return open(filename)
+    if threaded:
+        return io.TextIOWrapper(io.BufferedReader(ThreadedReader(opener(filename, 'rb'))))
+    return opener(filename, 'rt')
+
+def iter_records(filename, make_converter, spec, *, headers=None, errors='warn', threaded=False,
+                 split=csv_rows, **options):
+    '''
+    Return a generator of records from a CSV file.
+    make_converter(headers, spec, **options) builds the row converter.
+    split(file, headers) returns the rows of the file and its headers
+    (see csv_rows).  errors is checked right away, not when the first
+    record is asked for.
+    '''
+    check_errors(errors)
+    return _iter_records(filename, make_converter, spec, headers=headers, errors=errors,
+                         threaded=threaded, split=split, **options)
+
+def _iter_records(filename, make_converter, spec, *, headers, errors, threaded, split, **options):
+    with open_csv(filename, threaded=threaded) as file:
+        rows, headers = split(file, headers)
+        fallback = make_converter(headers, spec, fill=True, **options) if errors == 'fill' else None
+        yield from iter_convert(rows, make_converter(headers, spec, **options), headers,
+                                errors=errors, fallback=fallback)
+
+def _picklable(obj):
+    try:
+        pickle.dumps(obj)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return False
+    return True
+
+def read_records(filename, make_converter, spec, *, headers=None, errors='warn', workers=None,
+                 threaded=False, split=csv_rows, **options):
+    '''
+    Read a CSV file into a list of records (see iter_records).  workers
+    only applies to CSV files (the default split).  The file is read
+    serially if spec or options (say, a where lambda) can't be pickled
+    for the worker processes.
+    '''
+    check_errors(errors)
+    if (workers and split is csv_rows and not is_compressed(filename)
+        and _picklable((make_converter, spec, options))):
+        return read_parallel(filename, make_converter, spec, headers=headers, errors=errors,
+                             workers=workers, **options)
+    with open_csv(filename, threaded=threaded) as file:
+        rows, headers = split(file, headers)
+        fallback = make_converter(headers, spec, fill=True, **options) if errors == 'fill' else None
+        return convert_list(rows, make_converter(headers, spec, **options), headers,
+                            errors=errors, fallback=fallback, where=options.get('where') is not None)
+
+def read_csv_as_dicts(filename, types, *, headers=None, columns=None, where=None,
+                      errors='warn', workers=None, threaded=False, memo=None):
+    '''
+    Read CSV data into a list of dictionaries with optional type conversion.
+    columns optionally selects a subset of the columns by name or index.
+    where is an optional filter function whose argument names are column
+    names.  Only those columns are converted before it is called and rows
+    it rejects are never built.
+    If workers is given, the file is parsed in parallel by that many processes
+    (serially if types, where or memo can't be pickled, as with a lambda).
+    gzip, bz2 and xz compressed files are decompressed on the fly (in a
+    background thread if threaded is true).
+    errors sets what happens to rows that fail conversion ('warn', 'skip',
+    'raise', 'fill' or an ErrorReport to collect them in).
+    memo is an optional ConversionCache of converted values.
+    '''
+    return read_records(filename, dict_converter, types, headers=headers, errors=errors,
+                        workers=workers, threaded=threaded,
+                        columns=columns, where=where, memo=memo)
+
+def read_csv_as_instances(filename, cls, *, headers=None, columns=None, where=None,
+                          errors='warn', workers=None, threaded=False, memo=None):
+    '''
+    Read CSV data into a list of instances.
+    columns optionally selects a subset of the fields of cls by name or index.
+    The instances are then of a subclass of cls holding only those fields.
+    where is an optional filter function whose argument names are field
+    names.  Only those fields are converted before it is called and rows
+    it rejects are never built.
+    If workers is given, the file is parsed in parallel by that many processes
+    (serially if cls, where or memo can't be pickled, as with a lambda).
+    gzip, bz2 and xz compressed files are decompressed on the fly (in a
+    background thread if threaded is true).
+    errors sets what happens to rows that fail conversion ('warn', 'skip',
+    'raise', 'fill' or an ErrorReport to collect them in).
+    memo is an optional ConversionCache of converted values.
+    '''
+    return read_records(filename, instance_converter, cls, headers=headers, errors=errors,
+                        workers=workers, threaded=threaded,
+                        columns=columns, where=where, memo=memo)
+
+def iter_csv_as_dicts(filename, types, *, headers=None, columns=None, where=None,
+                      errors='warn', threaded=False, memo=None):
     '''
-    Read CSV data into a list of dictionaries with optional type conversion
+    Lazily read CSV data, generating one dictionary at a time
     '''
-    with open(filename) as file:
-        return csv_as_dicts(file, types, headers=headers)
+    return iter_records(filename, dict_converter, types, headers=headers, errors=errors,
+                        threaded=threaded, columns=columns, where=where,
+                        memo=memo)
 
-def read_csv_as_instances(filename, cls, *, headers=None):
+def iter_csv_as_instances(filename, cls, *, headers=None, columns=None, where=None,
+                          errors='warn', threaded=False, memo=None):
     '''
-    Read CSV data into a list of instances
+    Lazily read CSV data, generating one instance at a time
     '''
-    with open(filename) as file:
-        return csv_as_instances(file, cls, headers=headers)
+    return iter_records(filename, instance_converter, cls, headers=headers, errors=errors,
+                        threaded=threaded, columns=columns, where=where,
+                        memo=memo)
 
+def column_block(records):
+    '''
+    Turn a list of dicts or instances into a DataCollection of columns
+    '''
+    from .colreader import DataCollection, column_from_values
+    if isinstance(records[0], Structure):
+        names, values = records[0]._fields, zip(*records)
+    else:
+        names, values = list(records[0]), zip(*map(dict.values, records))
+    return DataCollection(dict(zip(names, map(column_from_values, values))), len(records))
+
+def converter_for(types_or_cls):
+    '''
+    Converter factory for a Structure class (instances) or a list of types (dicts)
+    '''
+    if isinstance(types_or_cls, type) and issubclass(types_or_cls, Structure):
+        return instance_converter
+    return dict_converter
+
+def read_csv_in_batches(filename, types_or_cls, batch_size=10000, *, columnar=False, **kwargs):
+    '''
+    Read CSV data in batches of up to batch_size records.  types_or_cls is
+    either a list of types (giving dicts) or a Structure class (giving
+    instances).  Each batch is a list, or a DataCollection of columns if
+    columnar is true.  Other keyword arguments are as for iter_csv_as_dicts.
+    '''
+    records = iter_records(filename, converter_for(types_or_cls), types_or_cls, **kwargs)
+    return _batches(records, batch_size, columnar)
+
+def _batches(records, batch_size, columnar):
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            break
+        yield column_block(batch) if columnar else batch
+
+def is_dat(filename):
+    '''
+    True if filename names a whitespace-delimited .dat file (possibly compressed)
+    '''
+    root, ext = os.path.splitext(filename)
+    if ext in { '.gz', '.bz2', '.xz' }:
+        ext = os.path.splitext(root)[1]
+    return ext == '.dat'
+
+def _read_file(filename, types_or_cls, options):
+    if is_dat(filename):
+        # .dat files have no header line
+        if isinstance(types_or_cls, type) and issubclass(types_or_cls, Structure):
+            options = { **options, 'headers': types_or_cls._fields }
+        elif options.get('headers') is None:
+            raise ValueError('headers must be given to read .dat files as dicts')
+        options = { **options, 'split': dat_rows }
+    return read_records(filename, converter_for(types_or_cls), types_or_cls, **options)
+
+def read_many(filenames, types_or_cls, *, workers=None, processes=False, **kwargs):
+    '''
+    Read many CSV files concurrently on a pool of threads, or of processes
+    if processes is true (for files where conversion rather than I/O is
+    the bottleneck).  Returns (records, errors): the records of all of the
+    files in the order given and a dict mapping each file that could not
+    be read to its exception.  Other keyword arguments are as for
+    read_csv_as_dicts and apply to each file.  .dat files are read as by
+    read_dat_as_dicts (with headers given) or read_dat_as_instances.
+    Threads are used instead of processes if types_or_cls or the other
+    arguments (say, a where lambda) can't be pickled.
+    '''
+    filenames = list(filenames)
+    records = []
+    errors = { }
+    if processes and not _picklable((types_or_cls, kwargs)):
+        log.debug("Can't send the arguments to worker processes; using threads")
+        processes = False
+    executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with executor(workers) as pool:
+        futures = [ pool.submit(_read_file, filename, types_or_cls, kwargs) for filename in filenames ]
+        for filename, future in zip(filenames, futures):
+            try:
+                records.extend(future.result())
+            except Exception as e:
+                log.warning('%s: %s', filename, e)
+                errors[filename] = e
+    return records, errors
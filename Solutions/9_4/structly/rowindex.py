@@ -0,0 +1,191 @@
+# rowindex.py
+
+__all__ = [ 'RowIndex', 'read_csv_rows' ]
+
+import csv
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from .reader import (next_record, decode_text, parse_range, bad_row, bad_row_summary,
+                     check_errors, converter_for)
+
+# Saved index: this header, the header record of the file and the offsets
+# (little-endian 'q').  Only plain data is read back, never objects.
+_MAGIC = b'STRUCTIX'
+_FORMAT = struct.Struct('<8sqqqqqq?')
+
+class RowIndex:
+    '''
+    Sparse index of a CSV file holding the byte offset of every step-th
+    record.  Any record can then be found by seeking to the nearest
+    indexed offset and skipping fewer than step records.  The index is
+    saved next to the file (as filename + '.idx') and reused for as long
+    as the file's size and modification time are unchanged.
+    '''
+    def __init__(self, filename, step, offsets, nrows, header, stamp, skip_header=True):
+        self.filename = filename
+        self.step = step
+        self.skip_header = skip_header
+        self.offsets = offsets
+        self.nrows = nrows
+        self.header = header
+        self.stamp = stamp
+
+    def __repr__(self):
+        return f'RowIndex({self.filename!r}, step={self.step}, nrows={self.nrows})'
+
+    def __len__(self):
+        return self.nrows
+
+    @staticmethod
+    def _stamp(filename):
+        st = os.stat(filename)
+        return (st.st_size, st.st_mtime_ns)
+
+    @classmethod
+    def build(cls, filename, step=1000, *, skip_header=True):
+        '''
+        Scan a file and build its index.  If skip_header is true, the first
+        record is held as the header and not counted as a row.
+        '''
+        stamp = cls._stamp(filename)
+        offsets = array('q')
+        nrows = 0
+        header = b''
+        pos = 0
+        inquote = False
+        with open(filename, 'rb') as f:
+            if skip_header:
+                header = f.readline()
+                while header.count(b'"') % 2:
+                    line = f.readline()
+                    if not line:
+                        break
+                    header += line
+                pos = len(header)
+            for line in f:
+                # A line starts a record unless it continues a quoted field
+                if not inquote:
+                    if nrows % step == 0:
+                        offsets.append(pos)
+                    nrows += 1
+                if line.count(b'"') % 2:
+                    inquote = not inquote
+                pos += len(line)
+        return cls(filename, step, offsets, nrows, header, stamp, skip_header)
+
+    def save(self, path):
+        '''
+        Write the index to a file
+        '''
+        offsets = array('q', self.offsets)
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+        with open(path, 'wb') as f:
+            f.write(_FORMAT.pack(_MAGIC, self.step, self.nrows, *self.stamp,
+                                 len(self.header), len(offsets), self.skip_header))
+            f.write(self.header)
+            f.write(offsets.tobytes())
+
+    @classmethod
+    def read(cls, path, filename):
+        '''
+        Read an index written by save() for filename.  Raises ValueError if
+        path doesn't hold one.
+        '''
+        with open(path, 'rb') as f:
+            data = f.read()
+        try:
+            magic, step, nrows, size, mtime, nheader, noffsets, skip_header = \
+                _FORMAT.unpack_from(data)
+        except struct.error:
+            raise ValueError(f'{path} is not a row index') from None
+        start = _FORMAT.size + nheader
+        if magic != _MAGIC or len(data) != start + 8 * noffsets or min(nheader, noffsets) < 0:
+            raise ValueError(f'{path} is not a row index')
+        offsets = array('q', data[start:])
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+        return cls(filename, step, offsets, nrows, data[_FORMAT.size:start], (size, mtime),
+                   skip_header)
+
+    @classmethod
+    def load(cls, filename, step=1000, *, skip_header=True):
+        '''
+        Return the saved index of a file, building (and saving) a new one if
+        there is none or the file has changed since it was made.
+        '''
+        path = os.fspath(filename) + '.idx'
+        try:
+            index = cls.read(path, filename)
+            if (index.step == step and index.skip_header == skip_header and
+                index.stamp == cls._stamp(filename)):
+                return index
+        except (OSError, ValueError):
+            pass
+
+        index = cls.build(filename, step, skip_header=skip_header)
+        try:
+            index.save(path)
+        except OSError:
+            pass
+        return index
+
+    def offset(self, mm, row):
+        '''
+        Byte offset of the start of a row (or the end of the data for row == len(self))
+        '''
+        if row >= self.nrows:
+            return len(mm)
+        pos = self.offsets[row // self.step]
+        for _ in range(row % self.step):
+            pos = next_record(mm, pos, pos)
+        return pos
+
+    def byte_range(self, start, stop):
+        '''
+        Return the (start, end) byte range holding rows start up to stop
+        '''
+        with open(self.filename, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return 0, 0
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return self.offset(mm, start), self.offset(mm, stop)
+
+    def split_ranges(self, nchunks):
+        '''
+        Split the rows into at most nchunks (start, end) byte ranges falling
+        on indexed records, for read_parallel.  Nothing is scanned beyond
+        the index itself.
+        '''
+        offsets = sorted({ self.offsets[n * len(self.offsets) // nchunks] for n in range(nchunks) }
+                         if self.offsets else ())
+        return list(zip(offsets, offsets[1:] + [self.stamp[0]]))
+
+def read_csv_rows(filename, types_or_cls, start=0, stop=None, *, index=None, step=1000,
+                  headers=None, columns=None, where=None, errors='warn'):
+    '''
+    Read rows start up to stop of a CSV file, as dicts (types_or_cls is a
+    list of types) or instances (a Structure class).  Negative positions
+    count back from the end, so start=-n reads the last n rows.  The rows
+    are found with a RowIndex, which is loaded or built if not given.
+    '''
+    check_errors(errors)
+    if index is None:
+        index = RowIndex.load(filename, step, skip_header=headers is None)
+    if headers is None:
+        headers = next(csv.reader(decode_text(index.header)), [])
+
+    start, stop, _ = slice(start, stop).indices(len(index))
+    if start >= stop:
+        return []
+    begin, end = index.byte_range(start, stop)
+    records, bad, _ = parse_range(filename, begin, end, converter_for(types_or_cls), types_or_cls,
+                                  headers, errors == 'fill', dict(columns=columns, where=where))
+    for nbad, (rowno, row, reason) in enumerate(bad, start=1):
+        bad_row(errors, nbad, start + rowno, row, ValueError(reason))
+    bad_row_summary(errors, len(bad))
+    return records
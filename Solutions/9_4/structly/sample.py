@@ -0,0 +1,118 @@
+# sample.py
+
+__all__ = [ 'sample_csv' ]
+
+import csv
+import mmap
+import os
+import random
+from itertools import islice
+from math import exp, floor, log
+from operator import itemgetter
+
+from .reader import (open_csv, select_columns, iter_convert, check_errors,
+                     bad_row, bad_row_summary, converter_for, is_compressed, decode_text,
+                     next_record, ErrorReport)
+from .rowindex import RowIndex
+
+def _reservoir(items, n, rng):
+    '''
+    Uniform sample of n items from an iterator in one pass (Algorithm L).
+    Runs of skipped items are consumed by islice without being looked at.
+    '''
+    reservoir = list(islice(items, n))
+    if len(reservoir) < n or n == 0:
+        return reservoir
+    w = exp(log(1.0 - rng.random()) / n)
+    while w < 1.0:
+        skip = floor(log(1.0 - rng.random()) / log(1.0 - w))
+        item = next(islice(items, skip, None), None)
+        if item is None:
+            break
+        reservoir[rng.randrange(n)] = item
+        w *= exp(log(1.0 - rng.random()) / n)
+    return reservoir
+
+def _stratified(items, n, key, rng):
+    '''
+    Uniform sample of up to n items for each distinct key(item) (Algorithm R)
+    '''
+    groups = { }
+    seen = { }
+    for item in items:
+        k = key(item)
+        count = seen[k] = seen.get(k, 0) + 1
+        if count <= n:
+            groups.setdefault(k, []).append(item)
+        else:
+            pos = rng.randrange(count)
+            if pos < n:
+                groups[k][pos] = item
+    return [ item for group in groups.values() for item in group ]
+
+def _seek_rows(filename, n, rng, skip_header):
+    '''
+    Sample n records by seeking to randomly chosen rows with a RowIndex.
+    Returns (header, [(rowno, row), ...]).
+    '''
+    index = RowIndex.load(filename, skip_header=skip_header)
+    picks = sorted(rng.sample(range(len(index)), min(n, len(index))))
+    rows = [ ]
+    with open(filename, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return index.header, rows
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for rowno in picks:
+                start = index.offset(mm, rowno)
+                record = mm[start:next_record(mm, start, start)]
+                rows.append((rowno + 1, next(csv.reader(decode_text(record)), [])))
+    return index.header, rows
+
+def sample_csv(filename, types_or_cls, n, *, by=None, seek=False, seed=None, headers=None,
+               columns=None, errors='warn', threaded=False):
+    '''
+    Read a uniform random sample of n rows of a CSV file, as dicts
+    (types_or_cls is a list of types) or instances (a Structure class).
+    Rows are sampled before conversion, so only the sampled rows are
+    converted.  The sample is returned in file order and rows that fail
+    conversion are dropped from it according to errors.
+
+    By default the file is sampled in one pass.  If seek is true, the
+    sampled rows are read by seeking with a RowIndex instead (loaded or
+    built on first use).  by names a column to stratify on: up to n rows
+    are then sampled for each of its distinct values.  seed makes the
+    sample repeatable.
+    '''
+    check_errors(errors)
+    rng = random.Random(seed)
+    if seek:
+        if by is not None or is_compressed(filename):
+            raise ValueError('seek sampling needs an uncompressed file and no by column')
+        header, sample = _seek_rows(filename, n, rng, headers is None)
+        if headers is None:
+            headers = next(csv.reader(decode_text(header)), [])
+    else:
+        with open_csv(filename, threaded=threaded) as file:
+            rows = csv.reader(file)
+            if headers is None:
+                headers = next(rows, [])
+            # Blank rows are never sampled
+            items = filter(itemgetter(1), enumerate(rows, start=1))
+            if by is None:
+                sample = _reservoir(items, n, rng)
+            else:
+                pos = select_columns(headers, [by])[0]
+                key = lambda item: item[1][pos] if pos < len(item[1]) else None
+                sample = _stratified(items, n, key, rng)
+        sample.sort(key=itemgetter(0))
+
+    make_converter = converter_for(types_or_cls)
+    converter = make_converter(headers, types_or_cls, columns)
+    fallback = make_converter(headers, types_or_cls, columns, fill=True) if errors == 'fill' else None
+    report = ErrorReport(limit=None)
+    records = list(iter_convert([ row for _, row in sample ], converter, headers,
+                                errors=report, fallback=fallback))
+    for nbad, (pos, row, reason) in enumerate(report.rows, start=1):
+        bad_row(errors, nbad, sample[pos - 1][0], row, ValueError(reason))
+    bad_row_summary(errors, report.count)
+    return records
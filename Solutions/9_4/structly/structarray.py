@@ -0,0 +1,159 @@
+# structarray.py
+#
+# Struct-of-arrays storage for a Structure class.  Each field is kept in
+# its own column: an array for Integer and Float fields and a list of
+# interned strings for String fields.  Rows are handed out as light
+# views that read and write the columns.
+
+__all__ = [ 'StructureArray' ]
+
+import collections
+import sys
+from array import array
+from functools import lru_cache
+from itertools import repeat
+from operator import attrgetter
+from types import new_class
+
+_typecodes = { int: 'q', float: 'd' }
+
+def _storage(validator):
+    '''
+    Return (make a new column, function applied to each stored value)
+    for the values of a validator
+    '''
+    expected_type = getattr(validator, 'expected_type', None)
+    if expected_type in _typecodes:
+        return (lambda: array(_typecodes[expected_type])), None
+    if expected_type is str:
+        return list, sys.intern
+    return list, None
+
+@lru_cache(maxsize=128)
+def row_view(cls):
+    '''
+    Make the class of row views for a Structure class.  A view is a
+    subclass of cls whose fields are properties reading and writing
+    the columns of a StructureArray, so the methods and properties of
+    cls work on it.  Values set through a view are validated.
+    '''
+    def field(n, validator, store):
+        def get(self):
+            return self._columns[n][self._pos]
+        def set(self, value):
+            value = validator.check(value)
+            self._columns[n][self._pos] = store(value) if store else value
+        return property(get, set)
+
+    def __eq__(self, other):
+        return isinstance(other, cls) and tuple(self) == tuple(other)
+
+    def __reduce__(self):
+        # Views pickle as regular instances
+        return _make_instance, (cls, tuple(self))
+
+    namespace = { name: field(n, getattr(cls, name), _storage(getattr(cls, name))[1])
+                  for n, name in enumerate(cls._fields) }
+    namespace.update(__slots__=('_columns', '_pos'), __eq__=__eq__, __reduce__=__reduce__,
+                     __module__=cls.__module__, __qualname__=cls.__qualname__)
+    view = new_class(cls.__name__, (cls,), exec_body=lambda ns: ns.update(namespace))
+    view._fields = cls._fields
+    view._types = cls._types
+
+    new = object.__new__
+    set_columns = view._columns.__set__
+    set_pos = view._pos.__set__
+    def make(columns, pos):
+        row = new(view)
+        set_columns(row, columns)
+        set_pos(row, pos)
+        return row
+    view._make = staticmethod(make)
+    return view
+
+def _make_instance(cls, values):
+    return cls._build(*values)
+
+class StructureArray(collections.abc.Sequence):
+    '''
+    Column-wise storage of instances of a Structure class.  Indexing
+    gives a row view, an instance of cls that reads and writes the
+    columns, and slicing gives a StructureArray sharing the columns
+    of this one.
+    '''
+    def __init__(self, cls, records=()):
+        self.cls = cls
+        storage = [ _storage(getattr(cls, name)) for name in cls._fields ]
+        self._columns = [ make() for make, _ in storage ]
+        self._stores = [ store for _, store in storage ]
+        self._rows = range(0)
+        self._view = False
+        self.extend(records)
+
+    @classmethod
+    def from_rows(cls, structure, rows):
+        '''
+        Create a StructureArray of structure from rows of raw values.  Rows
+        are converted and validated a column at a time.
+        '''
+        columns = list(zip(*rows, strict=True)) or [ () ] * len(structure._fields)
+        return cls.from_columns(structure, columns)
+
+    @classmethod
+    def from_columns(cls, structure, columns):
+        '''
+        Create a StructureArray of structure from columns of raw values,
+        one for each field (see Structure.from_columns)
+        '''
+        self = cls(structure)
+        self._extend_columns(structure.check_columns(columns))
+        return self
+
+    def _extend_columns(self, values):
+        if self._view:
+            raise TypeError('cannot add rows to a view')
+        for column, store, data in zip(self._columns, self._stores, values):
+            column.extend(map(store, data) if store else data)
+        self._rows = range(len(self._columns[0]) if self._columns else 0)
+
+    def append(self, record):
+        '''
+        Add an instance of cls
+        '''
+        self.extend([record])
+
+    def extend(self, records):
+        '''
+        Add instances of cls
+        '''
+        records = list(records)
+        for record in records:
+            if not isinstance(record, self.cls):
+                raise TypeError(f'expected {self.cls.__name__}, got {type(record).__name__}')
+        self._extend_columns([ list(map(attrgetter(name), records)) for name in self.cls._fields ])
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            view = StructureArray.__new__(StructureArray)
+            view.__dict__.update(self.__dict__, _rows=self._rows[index], _view=True)
+            return view
+        return row_view(self.cls)._make(self._columns, self._rows[index])
+
+    def __iter__(self):
+        return map(row_view(self.cls)._make, repeat(self._columns), self._rows)
+
+    def column(self, name):
+        '''
+        Return the values of a field for the rows of this array.  They
+        are the stored column itself unless this is a slice.
+        '''
+        column = self._columns[self.cls._fields.index(name)]
+        rows = self._rows
+        if not self._view:
+            return column
+        if not rows:
+            return column[0:0]
+        return column[rows.start:rows.stop if rows.stop >= 0 else None:rows.step]
@@ -2,25 +2,44 @@
 
 __all__ = [ 'Structure' ]
 
-from .validate import Validator, validated
+from .validate import (Validator, SlotValidator, validated, slot_validator, check_source,
+                       column_check)
 from collections import ChainMap
+from copy import copy
+from functools import lru_cache
+from types import new_class
 
 class StructureMeta(type):
     @classmethod
-    def __prepare__(meta, clsname, bases):
+    def __prepare__(meta, clsname, bases, **kwargs):
         return ChainMap({}, Validator.validators)
         
     @staticmethod
-    def __new__(meta, name, bases, methods):
+    def __new__(meta, name, bases, methods, **kwargs):
         methods = methods.maps[0]
-        return super().__new__(meta, name, bases, methods)
+        if kwargs.get('slots'):
+            # Each validated field is stored in a slot named _field
+            methods['__slots__'] = tuple('_' + name for name, val in methods.items()
+                                         if isinstance(val, Validator))
+        return super().__new__(meta, name, bases, methods, **kwargs)
 
 class Structure(metaclass=StructureMeta):
+    '''
+    Base class for validated record structures.  Subclasses defined with
+    the class keyword slots=True store their fields in __slots__ and
+    their instances have no __dict__:
+
+        class Stock(Structure, slots=True):
+            ...
+    '''
+    __slots__ = ()
     _fields = ()
     _types = ()
+    _field_slots = frozenset()
 
     def __setattr__(self, name, value):
-        if name.startswith('_') or name in self._fields:
+        # The slots of fields are only set through the fields' validators
+        if name in self._fields or (name.startswith('_') and name not in self._field_slots):
             super().__setattr__(name, value)
         else:
             raise AttributeError('No attribute %s' % name)
@@ -41,22 +60,83 @@ class Structure(metaclass=StructureMeta):
         rowdata = [ func(val) for func, val in zip(cls._types, row) ]
         return cls(*rowdata)
 
+    @classmethod
+    def from_rows(cls, rows, *, columnar=False):
+        '''
+        Create instances from many rows at once (see from_columns)
+        '''
+        columns = list(zip(*rows, strict=True)) or [ () ] * len(cls._fields)
+        return cls.from_columns(columns, columnar=columnar)
+
+    @classmethod
+    def from_columns(cls, columns, *, columnar=False):
+        '''
+        Create instances from columns of values, one for each field.
+        Each column is converted and validated as a whole, then the
+        instances are built without going through __init__.  If columnar
+        is true, a DataCollection of the checked columns is returned
+        instead of a list of instances.
+        '''
+        columns = cls.check_columns(columns)
+        if columnar:
+            from .colreader import DataCollection, column_from_values
+            return DataCollection({ name: column_from_values(column)
+                                    for name, column in zip(cls._fields, columns) })
+        return list(map(cls._build, *columns))
+
+    @classmethod
+    def check_columns(cls, columns):
+        '''
+        Convert and validate columns of values, one for each field.
+        Returns a list of the checked columns.
+        '''
+        if len(columns) != len(cls._fields):
+            raise TypeError(f'expected {len(cls._fields)} columns, got {len(columns)}')
+        return [ column_check(getattr(cls, name))(list(map(func, column)))
+                 for name, func, column in zip(cls._fields, cls._types, columns) ]
+
     @classmethod
     def create_init(cls):
         '''
-        Create an __init__ method from _fields
+        Create an __init__ method from _fields.  The checks of each
+        field's validator are inlined and values are stored straight
+        into the instance, without going through __setattr__ and the
+        validator's __set__.
         '''
         args = ','.join(cls._fields)
         code = f'def __init__(self, {args}):\n'
-        for name in cls._fields:
-            code += f'    self.{name} = {name}\n'
-        locs = { }
-        exec(code, locs)
-        cls.__init__ = locs['__init__']
+        env = { }
+        stores = [ ]
+        for n, name in enumerate(cls._fields):
+            validator = vars(cls)[name]
+            env[f'_v{n}'] = validator
+            check = check_source(type(validator), name, f'_v{n}')
+            if check is None:
+                check = f'{name} = _v{n}.check({name})'
+            code += ''.join(f'    {line}\n' for line in check.splitlines())
+            if isinstance(validator, SlotValidator):
+                env[f'_s{n}'] = validator.slot.__set__
+                stores.append(f'    _s{n}(self, {name})\n')
+            else:
+                stores.append(f'    _dict[{name!r}] = {name}\n')
+        if any('_dict[' in store for store in stores):
+            stores.insert(0, '    _dict = self.__dict__\n')
+        code += ''.join(stores)
+        exec(code, env)
+        cls.__init__ = env['__init__']
+
+        # _build(*values) makes an instance from values already checked
+        code = f'def _build({args}):\n    self = _new(_cls)\n'
+        code += ''.join(stores) + '    return self\n'
+        env.update(_new=object.__new__, _cls=cls)
+        exec(code, env)
+        cls._build = staticmethod(env['_build'])
 
     @classmethod
-    def __init_subclass__(cls):
+    def __init_subclass__(cls, slots=False):
         # Apply the validated decorator to subclasses
+        if slots:
+            slot_attributes(cls)
         validate_attributes(cls)
 
 def validate_attributes(cls):
@@ -88,6 +168,45 @@ def validate_attributes(cls):
     
     return cls
 
+def slot_attributes(cls):
+    '''
+    Make the validators of a class defined with slots=True store their
+    values in the slots made for them by StructureMeta
+    '''
+    for name, val in list(vars(cls).items()):
+        if isinstance(val, Validator):
+            val.__class__ = slot_validator(type(val))
+            val.slot = vars(cls)['_' + name]
+    cls._field_slots = cls._field_slots | set(cls.__slots__)
+    # The default pickling of slots would set them with setattr()
+    cls.__reduce__ = _reduce_slots
+    return cls
+
+def _reduce_slots(self):
+    return _rebuild, (type(self), tuple(self))
+
+def _rebuild(cls, values):
+    return cls._build(*values)
+
 def typed_structure(clsname, **validators):
     cls = type(clsname, (Structure,), validators)
     return cls
+
+@lru_cache(maxsize=128)
+def projected_structure(cls, fields):
+    '''
+    Make a subclass of a structure that only holds the given fields
+    '''
+    def __reduce__(self):
+        return _make_projected, (cls, fields, tuple(self))
+
+    namespace = { name: copy(getattr(cls, name)) for name in fields }
+    namespace.update(__module__=cls.__module__, __qualname__=cls.__qualname__,
+                     __reduce__=__reduce__)
+    if cls._field_slots:
+        # Keep instances of slotted classes free of a __dict__
+        namespace['__slots__'] = ()
+    return new_class(cls.__name__, (cls,), exec_body=lambda ns: ns.update(namespace))
+
+def _make_projected(cls, fields, values):
+    return projected_structure(cls, fields)(*values)
@@ -1,5 +1,7 @@
 # validate.py
 
+from functools import lru_cache
+
 class Validator:
     def __init__(self, name=None):
         self.name = name
@@ -11,6 +13,9 @@ class Validator:
     def check(cls, value):
         return value
 
+    # Source of the test made by check() in this class (see check_source)
+    check_code = ''
+
     def __set__(self, instance, value):
         instance.__dict__[self.name] = self.check(value)
 
@@ -20,6 +25,33 @@ class Validator:
     def __init_subclass__(cls):
         cls.validators[cls.__name__] = cls
 
+class SlotValidator:
+    '''
+    Mixin for a Validator whose value is stored in a slot (a member
+    descriptor of the class) instead of the instance __dict__
+    '''
+    slot = None
+
+    def __get__(self, instance, cls):
+        if instance is None:
+            return self
+        return self.slot.__get__(instance, cls)
+
+    def __set__(self, instance, value):
+        self.slot.__set__(instance, self.check(value))
+
+    # Slot variants are not registered in Validator.validators
+    @classmethod
+    def __init_subclass__(cls):
+        pass
+
+@lru_cache(maxsize=None)
+def slot_validator(cls):
+    '''
+    Return the slot-storing variant of a Validator class
+    '''
+    return type(cls.__name__, (SlotValidator, cls), { '__module__': cls.__module__ })
+
 class Typed(Validator):
     expected_type = object
     @classmethod
@@ -28,6 +60,9 @@ class Typed(Validator):
             raise TypeError(f'expected {cls.expected_type}')
         return super().check(value)
 
+    check_code = ('if not isinstance({var}, {cls}.expected_type):\n'
+                  "    raise TypeError(f'expected {{{cls}.expected_type}}')")
+
 _typed_classes = [
     ('Integer', int),
     ('Float', float),
@@ -43,6 +78,9 @@ class Positive(Validator):
             raise ValueError('must be >= 0')
         return super().check(value)
 
+    check_code = ('if {var} < 0:\n'
+                  "    raise ValueError('must be >= 0')")
+
 class NonEmpty(Validator):
     @classmethod
     def check(cls, value):
@@ -50,6 +88,43 @@ class NonEmpty(Validator):
             raise ValueError('must be non-empty')
         return super().check(value)
 
+    check_code = ('if len({var}) == 0:\n'
+                  "    raise ValueError('must be non-empty')")
+
+def check_source(cls, var, clsname):
+    '''
+    Return source code doing cls.check(var) with the super() chain
+    flattened, or None if some check in it has no check_code.  clsname
+    is the name the code uses for cls.
+    '''
+    lines = []
+    for base in cls.__mro__:
+        if 'check' in vars(base):
+            if 'check_code' not in vars(base):
+                return None
+            if base.check_code:
+                lines.append(base.check_code.format(var=var, cls=clsname))
+    return '\n'.join(lines)
+
+@lru_cache(maxsize=256)
+def column_check(validator):
+    '''
+    Return a function that applies validator.check() to every value of
+    a column, with the checks inlined into a single loop.  It returns
+    the checked values.
+    '''
+    check = check_source(type(validator), 'value', 'validator')
+    if check is None:
+        return lambda values: list(map(validator.check, values))
+    if not check:
+        return lambda values: values
+    code = 'def check_column(values):\n    for value in values:\n'
+    code += ''.join(f'        {line}\n' for line in check.splitlines())
+    code += '    return values\n'
+    env = { 'validator': validator }
+    exec(code, env)
+    return env['check_column']
+
 class PositiveInteger(Integer, Positive):
     pass
 
@@ -0,0 +1,102 @@
+# writer.py
+#
+# Writing records back out as CSV.  Fields are pulled out of each record
+# with a single attrgetter/itemgetter built from the schema and rows go
+# to csv.writer.writerows() through a large write buffer, so there is no
+# per-row Python code.
+
+__all__ = [ 'write_csv_from_instances',
+            'write_csv_from_dicts',
+            'write_csv_from_columns' ]
+
+import bz2
+import csv
+import gzip
+import lzma
+from contextlib import nullcontext
+from itertools import chain
+from operator import attrgetter, itemgetter
+
+from .colreader import DictColumn
+
+_BUFFER_SIZE = 1 << 20
+
+_compressors = { '.gz': gzip.open,
+                 '.bz2': bz2.open,
+                 '.xz': lzma.open }
+
+def open_output(filename, *, compress=None):
+    '''
+    Open a file for writing CSV text.  compress is '.gz', '.bz2' or '.xz',
+    with or without the dot (by default, taken from the extension of
+    filename).  A file object is returned as is.
+    '''
+    if hasattr(filename, 'write'):
+        return nullcontext(filename)
+    if compress is None:
+        compress = next((ext for ext in _compressors if str(filename).endswith(ext)), None)
+    if compress:
+        ext = compress if compress.startswith('.') else '.' + compress
+        if ext not in _compressors:
+            raise ValueError(f"compress must be one of {', '.join(map(repr, _compressors))}, "
+                             f"not {compress!r}")
+        return _compressors[ext](filename, 'wt', newline='')
+    return open(filename, 'w', newline='', buffering=_BUFFER_SIZE)
+
+def _getter(make_getter, names):
+    getter = make_getter(*names)
+    if len(names) == 1:
+        # A getter for a single name returns a value, not a tuple
+        return lambda record: (getter(record),)
+    return getter
+
+def write_rows(filename, headers, rows, *, compress=None):
+    '''
+    Write headers and then rows (sequences of values) to a CSV file
+    '''
+    with open_output(filename, compress=compress) as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(headers)
+        writer.writerows(rows)
+
+def write_csv_from_instances(filename, instances, columns=None, *, compress=None):
+    '''
+    Write instances of a Structure to a CSV file.  columns optionally
+    selects the fields to write (all of them by default).  filename may
+    also be an open file.  Output is compressed if filename ends in .gz,
+    .bz2 or .xz, or if compress names one of those.
+    '''
+    instances = iter(instances)
+    first = next(instances, None)
+    if first is None:
+        headers = columns or []
+        rows = []
+    else:
+        headers = list(columns or first._fields)
+        rows = map(_getter(attrgetter, headers), chain([first], instances))
+    write_rows(filename, headers, rows, compress=compress)
+
+def write_csv_from_dicts(filename, rows, columns=None, *, compress=None):
+    '''
+    Write dictionaries to a CSV file.  columns gives the keys to write
+    (by default, the keys of the first dictionary).  The other arguments
+    are as for write_csv_from_instances.
+    '''
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        headers = columns or []
+        rows = []
+    else:
+        headers = list(columns or first)
+        rows = map(_getter(itemgetter, headers), chain([first], rows))
+    write_rows(filename, headers, rows, compress=compress)
+
+def write_csv_from_columns(filename, data, columns=None, *, compress=None):
+    '''
+    Write a DataCollection of columns to a CSV file (see write_csv_from_instances)
+    '''
+    headers = list(columns or data.column_names)
+    values = [ data.column(name) for name in headers ]
+    values = [ col.decode() if isinstance(col, DictColumn) else col for col in values ]
+    write_rows(filename, headers, zip(*values), compress=compress)
@@ -0,0 +1,425 @@
+# testreader.py
+
+import stock
+import structly
+from structly import reader, colreader, colfile
+import unittest
+import asyncio
+import bz2
+import csv
+import decimal
+import io
+import os
+import pathlib
+import tempfile
+import types
+from array import array
+from unittest import mock
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class TestReader(unittest.TestCase):
+    def test_read_dicts(self):
+        rows = structly.read_csv_as_dicts('../../Data/portfolio.csv', [str, int, float])
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(rows[0], {'name': 'AA', 'shares': 100, 'price': 32.2})
+
+    def test_read_instances(self):
+        port = structly.read_csv_as_instances('../../Data/portfolio.csv', stock.Stock)
+        self.assertEqual(len(port), 7)
+        self.assertEqual(port[0], stock.Stock('AA', 100, 32.2))
+
+    def test_headers(self):
+        rows = structly.read_csv_as_dicts('../../Data/portfolio_noheader.csv', [str, int, float],
+                                          headers=['name', 'shares', 'price'])
+        self.assertEqual(rows[0], {'name': 'AA', 'shares': 100, 'price': 32.2})
+
+    def test_iter_dicts(self):
+        rows = structly.iter_csv_as_dicts('../../Data/portfolio.csv', [str, int, float])
+        self.assertEqual(next(rows), {'name': 'AA', 'shares': 100, 'price': 32.2})
+        self.assertEqual(len(list(rows)), 6)
+
+    def test_iter_instances(self):
+        port = structly.iter_csv_as_instances('../../Data/portfolio.csv', stock.Stock)
+        self.assertEqual(list(port),
+                         structly.read_csv_as_instances('../../Data/portfolio.csv', stock.Stock))
+
+    def test_bad_rows(self):
+        with self.assertLogs('structly.reader', level='WARNING') as cm:
+            rows = list(structly.iter_csv_as_dicts('../../Data/missing.csv', [str, int, float]))
+        self.assertEqual(len(rows), 20)
+        self.assertEqual(len(cm.output), 8)
+        self.assertIn('Row 4: Bad row', cm.output[0])
+
+    def test_parallel(self):
+        port = structly.read_csv_as_instances('../../Data/portfolio.csv', stock.Stock, workers=2)
+        self.assertEqual(port, structly.read_csv_as_instances('../../Data/portfolio.csv', stock.Stock))
+        with self.assertLogs('structly.reader', level='WARNING') as cm:
+            rows = structly.read_csv_as_dicts('../../Data/missing.csv', [str, int, float], workers=2)
+        self.assertEqual(len(rows), 20)
+        self.assertIn('Row 4: Bad row', cm.output[0])
+
+    def test_split_ranges(self):
+        header, ranges = reader.split_ranges('../../Data/portfolio.csv', 3)
+        self.assertEqual(header, b'name,shares,price\n')
+        self.assertEqual(ranges, [(18, 48), (48, 95), (95, 127)])
+
+    def test_compiled_converters(self):
+        convert = reader.dict_converter(['name', 'shares', 'price'], [str, int, float])
+        self.assertEqual(convert(None, ['AA', '100', '32.2', 'extra']),
+                         {'name': 'AA', 'shares': 100, 'price': 32.2})
+        with self.assertRaises(ValueError):
+            convert(None, ['AA', '100'])
+        convert = reader.instance_converter(None, stock.Stock)
+        self.assertEqual(convert(None, ['AA', '100', '32.2']), stock.Stock('AA', 100, 32.2))
+
+    def test_blank_lines(self):
+        rows = reader.csv_as_dicts(['name,shares\n', 'AA,100\n', '\n', 'IBM,50\n'], [str, int])
+        self.assertEqual(rows, [{'name': 'AA', 'shares': 100}, {'name': 'IBM', 'shares': 50}])
+
+    def test_columns(self):
+        data = structly.read_csv_as_columns('../../Data/portfolio.csv', [str, int, float])
+        self.assertEqual(len(data), 7)
+        self.assertEqual(data[0], {'name': 'AA', 'shares': 100, 'price': 32.2})
+        self.assertEqual(list(data), structly.read_csv_as_dicts('../../Data/portfolio.csv', [str, int, float]))
+        self.assertEqual(data.column('shares').typecode, 'q')
+        self.assertEqual(data.column('price').typecode, 'd')
+        names = data.column('name')
+        self.assertEqual(len(names.values), 5)
+        self.assertEqual(list(data[1:3].column('name')), ['IBM', 'CAT'])
+        data = structly.read_csv_as_columns('../../Data/portfolio.csv', [str, int, float], columns=[])
+        self.assertEqual((len(data), list(data), len(data[2:])), (7, [{}] * 7, 5))
+        with self.assertRaises(IndexError):
+            data[7]
+
+    @unittest.skipUnless(numpy, 'numpy is not installed')
+    def test_numpy(self):
+        data = structly.read_csv_as_columns('../../Data/portfolio.csv', [str, int, float], numpy=True)
+        self.assertIsInstance(data.column('shares'), numpy.ndarray)
+        self.assertEqual(data.column('shares').dtype, numpy.int64)
+        self.assertEqual(data.column('price').tolist(), [32.2, 91.1, 83.44, 51.23, 40.37, 65.1, 70.44])
+        self.assertEqual(list(data.column('name'))[:2], ['AA', 'IBM'])
+        self.assertEqual(colreader.to_numpy(memoryview(array('q', [1, 2]))).tolist(), [1, 2])
+
+        data = structly.read_csv_as_columns('../../Data/missing.csv',
+                                            [str, structly.nullable(int), structly.nullable(float)],
+                                            errors='skip', numpy=True)
+        shares = data.column('shares')
+        self.assertIsInstance(shares, numpy.ma.MaskedArray)
+        self.assertEqual((len(shares), shares.count()), (27, 20))
+        self.assertIs(shares[3], numpy.ma.masked)
+        self.assertEqual(shares[2], 5)
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'missing.col')
+            structly.write_colfile(filename, data)
+            with structly.read_colfile(filename) as col:
+                self.assertEqual(list(col.column('shares')), shares.tolist())
+
+    def test_projection(self):
+        rows = structly.read_csv_as_dicts('../../Data/portfolio.csv', [str, int, float],
+                                          columns=['name', 2])
+        self.assertEqual(rows[0], {'name': 'AA', 'price': 32.2})
+        port = structly.read_csv_as_instances('../../Data/portfolio.csv', stock.Stock,
+                                              columns=['name', 'shares'])
+        self.assertIsInstance(port[0], stock.Stock)
+        self.assertEqual(port[0]._fields, ('name', 'shares'))
+        self.assertEqual(tuple(port[0]), ('AA', 100))
+        with self.assertRaises(AttributeError):
+            port[0].price = 32.2
+        data = structly.read_csv_as_columns('../../Data/portfolio.csv', [str, int, float],
+                                            columns=['shares'])
+        self.assertEqual(data.column_names, ['shares'])
+        with self.assertRaises(ValueError):
+            structly.read_csv_as_dicts('../../Data/portfolio.csv', [str, int, float], columns=['bogus'])
+        rows = structly.read_csv_as_dicts('../../Data/portfolio.csv', [str, int, float],
+                                          columns=[-1, 0])
+        self.assertEqual(rows[0], {'price': 32.2, 'name': 'AA'})
+        for col in [5, -4]:
+            with self.assertRaises(ValueError):
+                structly.read_csv_as_dicts('../../Data/portfolio.csv', [str, int, float], columns=[col])
+
+    def test_where(self):
+        port = structly.read_csv_as_instances('../../Data/portfolio.csv', stock.Stock,
+                                              where=lambda shares: shares > 100)
+        self.assertEqual([s.name for s in port], ['CAT', 'MSFT'])
+        rows = structly.read_csv_as_dicts('../../Data/portfolio.csv', [str, int, float], workers=2,
+                                          where=lambda shares: shares > 100)
+        self.assertEqual([row['name'] for row in rows], ['CAT', 'MSFT'])
+        rows = structly.read_csv_as_dicts('../../Data/portfolio.csv', [str, int, float],
+                                          columns=['name'], where=lambda shares, price: shares * price > 10000)
+        self.assertEqual(rows, [{'name': 'CAT'}, {'name': 'MSFT'}])
+        data = structly.read_csv_as_columns('../../Data/portfolio.csv', [str, int, float],
+                                            where=lambda name: name == 'IBM')
+        self.assertEqual(len(data), 2)
+
+    def test_compressed(self):
+        expected = structly.read_csv_as_instances('../../Data/portfolio.csv', stock.Stock)
+        self.assertEqual(structly.read_csv_as_instances('../../Data/portfolio.csv.gz', stock.Stock),
+                         expected)
+        self.assertEqual(structly.read_csv_as_instances('../../Data/portfolio.csv.gz', stock.Stock,
+                                                        threaded=True),
+                         expected)
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'portfolio')
+            with open('../../Data/portfolio.csv', 'rb') as f:
+                with open(filename, 'wb') as out:
+                    out.write(bz2.compress(f.read()))
+            self.assertEqual(len(structly.read_csv_as_columns(filename, [str, int, float],
+                                                              threaded=True)), 7)
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = structly.ParseCache(tmp)
+            for _ in range(2):
+                port = cache.read_csv_as_instances('../../Data/portfolio.csv', stock.Stock)
+                self.assertEqual(port, structly.read_csv_as_instances('../../Data/portfolio.csv', stock.Stock))
+                rows = cache.read_csv_as_dicts('../../Data/portfolio.csv', [str, int, float], columns=['name'])
+                self.assertEqual(rows[0], {'name': 'AA'})
+                data = cache.read_csv_as_columns('../../Data/portfolio.csv', [str, int, float])
+                self.assertEqual(data[6], {'name': 'IBM', 'shares': 100, 'price': 70.44})
+            stats = cache.stats()
+            self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (3, 3, 3))
+            for name in os.listdir(tmp):
+                with open(os.path.join(tmp, name), 'rb') as f:
+                    self.assertEqual(f.read(8), b'STRUCTLY')
+                with open(os.path.join(tmp, name), 'wb') as f:
+                    f.write(b'junk')
+            rows = cache.read_csv_as_dicts('../../Data/portfolio.csv', [str, int, float], columns=['name'])
+            self.assertEqual(rows[0], {'name': 'AA'})
+            # Decimals can't go in a column file, so they aren't cached
+            rows = cache.read_csv_as_dicts('../../Data/portfolio.csv', [str, int, decimal.Decimal])
+            self.assertEqual(rows[0]['price'], decimal.Decimal('32.20'))
+            self.assertEqual(cache.stats()['entries'], 3)
+            cache.max_bytes = 0
+            cache.read_csv_as_dicts('../../Data/portfolio.csv', [str, int])
+            self.assertEqual(cache.stats()['entries'], 0)
+            self.assertEqual(cache.stats()['evictions'], 4)
+
+    def test_error_policies(self):
+        report = structly.ErrorReport(limit=2)
+        rows = structly.read_csv_as_dicts('../../Data/missing.csv', [str, int, float], errors=report)
+        self.assertEqual(len(rows), 20)
+        self.assertEqual(report.count, 8)
+        self.assertEqual(report.rows[0][:2], (4, ['C', '', '53.08']))
+        self.assertEqual(len(report.rows), 2)
+
+        port = structly.read_csv_as_instances('../../Data/missing.csv', stock.Stock, errors='fill')
+        self.assertEqual(len(port), 28)
+        self.assertEqual(port[3], stock.Stock('C', 0, 53.08))
+
+        with self.assertRaises(ValueError):
+            structly.read_csv_as_dicts('../../Data/missing.csv', [str, int, float], errors='raise')
+        with self.assertRaises(ValueError):
+            structly.read_csv_as_dicts('../../Data/missing.csv', [str, int, float], errors='ignore')
+        # The lazy readers check the policy before anything is read
+        with self.assertRaises(ValueError):
+            structly.iter_csv_as_dicts('../../Data/missing.csv', [str, int, float], errors='ignore')
+        with self.assertRaises(ValueError):
+            structly.iter_csv_as_instances('../../Data/missing.csv', stock.Stock, errors='ignore')
+        with self.assertRaises(ValueError):
+            structly.read_csv_in_batches('../../Data/missing.csv', stock.Stock, errors='ignore')
+
+    def test_warning_limit(self):
+        lines = ['name,shares\n'] + [ 'AA,\n' ] * 25
+        with self.assertLogs('structly.reader', level='WARNING') as cm:
+            reader.csv_as_dicts(lines, [str, int])
+        self.assertEqual(len(cm.output), reader.WARN_LIMIT + 1)
+        self.assertIn('25 bad rows', cm.output[-1])
+
+    def test_memo(self):
+        memo = structly.ConversionCache(4, columns=['name', 'shares'])
+        rows = structly.read_csv_as_dicts('../../Data/portfolio.csv', [str, int, float], memo=memo)
+        self.assertEqual(rows, structly.read_csv_as_dicts('../../Data/portfolio.csv', [str, int, float]))
+        port = structly.read_csv_as_instances('../../Data/portfolio.csv', stock.Stock, memo=memo)
+        self.assertEqual(port[0], stock.Stock('AA', 100, 32.2))
+        stats = memo.stats()
+        self.assertEqual(set(stats), {'name', 'shares'})
+        self.assertEqual((stats['name']['hits'], stats['name']['misses']), (6, 8))
+        self.assertEqual(stats['name']['entries'], 4)
+
+    def test_nullable(self):
+        data = structly.read_csv_as_columns('../../Data/missing.csv',
+                                            [str, structly.nullable(int), structly.nullable(float)],
+                                            errors='skip')
+        self.assertEqual(len(data), 27)
+        self.assertEqual(data[3], {'name': 'C', 'shares': None, 'price': 53.08})
+        shares = data.column('shares')
+        self.assertEqual((shares.count(), shares.null_count), (20, 7))
+        self.assertEqual(shares.sum(), sum(s for s in shares if s is not None))
+        self.assertEqual(shares.min(), 5)
+        self.assertEqual(list(shares[2:5]), [5, None, 15])
+        column = reader.column_block([{'x': 1.5}, {'x': None}]).column('x')
+        self.assertEqual(column.mean(), 1.5)
+
+    def test_row_index(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'portfolio.csv')
+            with open(filename, 'w') as f:
+                f.write('name,shares,price\n"A\nB",1,2.0\nC,3,4.0\n"D,""E""",5,6.0\nF,7,8.0\n')
+            port = structly.read_csv_rows(filename, stock.Stock, 1, 3, step=2)
+            self.assertEqual(port, [stock.Stock('C', 3, 4.0), stock.Stock('D,"E"', 5, 6.0)])
+            self.assertTrue(os.path.exists(filename + '.idx'))
+            index = structly.RowIndex.load(filename, 2)
+            self.assertEqual((len(index), list(index.offsets)), (4, [18, 38]))
+            self.assertEqual(index.split_ranges(2), [(18, 38), (38, 62)])
+            rows = structly.read_csv_rows(filename, [str, int, float], -1, index=index)
+            self.assertEqual(rows, [{'name': 'F', 'shares': 7, 'price': 8.0}])
+            self.assertEqual(index.header, b'name,shares,price\n')
+            port = reader.read_parallel(filename, reader.instance_converter, stock.Stock,
+                                        workers=2, index=index)
+            self.assertEqual(port, structly.read_csv_as_instances(filename, stock.Stock))
+            with self.assertRaises(ValueError):
+                reader.read_parallel(filename, reader.instance_converter, stock.Stock,
+                                     headers=stock.Stock._fields, index=index)
+            # A file that isn't an index is replaced, and paths may be PathLike
+            with open(filename + '.idx', 'wb') as f:
+                f.write(b'\x80\x04junk')
+            index = structly.RowIndex.load(pathlib.Path(filename), 2)
+            self.assertEqual((len(index), list(index.offsets)), (4, [18, 38]))
+            self.assertEqual(structly.RowIndex.read(filename + '.idx', filename).nrows, 4)
+
+    def test_sample(self):
+        port = structly.read_csv_as_instances('../../Data/portfolio.csv', stock.Stock)
+        sample = structly.sample_csv('../../Data/portfolio.csv', stock.Stock, 3, seed=1)
+        self.assertEqual(len(sample), 3)
+        self.assertEqual(sample, [ s for s in port if s in sample ])
+        self.assertEqual(structly.sample_csv('../../Data/portfolio.csv', stock.Stock, 10), port)
+        sample = structly.sample_csv('../../Data/portfolio.csv', [str, int, float], 1, by='name')
+        self.assertEqual(sorted(row['name'] for row in sample), ['AA', 'CAT', 'GE', 'IBM', 'MSFT'])
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'portfolio.csv')
+            with open('../../Data/portfolio.csv') as f:
+                with open(filename, 'w') as out:
+                    out.write(f.read())
+            sample = structly.sample_csv(filename, stock.Stock, 4, seek=True, seed=2)
+            self.assertEqual(len(sample), 4)
+            self.assertEqual(sample, [ s for s in port if s in sample ])
+
+    def test_read_many(self):
+        filenames = ['../../Data/portfolio.csv', '../../Data/bogus.csv', '../../Data/portfolio2.csv']
+        with self.assertLogs('structly.reader', level='WARNING'):
+            port, errors = structly.read_many(filenames, stock.Stock, workers=2)
+        self.assertEqual(port, structly.read_csv_as_instances(filenames[0], stock.Stock) +
+                               structly.read_csv_as_instances(filenames[2], stock.Stock))
+        self.assertEqual(list(errors), ['../../Data/bogus.csv'])
+        self.assertIsInstance(errors['../../Data/bogus.csv'], FileNotFoundError)
+        with self.assertLogs('structly.reader', level='WARNING'):
+            records, errors = structly.read_many(filenames, stock.Stock, processes=True)
+        self.assertEqual((records, list(errors)), (port, ['../../Data/bogus.csv']))
+        records, errors = structly.read_many(filenames[:1], stock.Stock, processes=True,
+                                             where=lambda shares: shares > 100)
+        self.assertEqual(([s.name for s in records], errors), (['CAT', 'MSFT'], {}))
+
+    def test_dat(self):
+        port = structly.read_dat_as_instances('../../Data/portfolio.dat', stock.Stock)
+        self.assertEqual(port, structly.read_csv_as_instances('../../Data/portfolio.csv', stock.Stock))
+        rows = structly.read_dat_as_dicts('../../Data/portfolio3.dat', [str, int, float],
+                                          ['name', 'shares', 'price'], errors='skip')
+        self.assertEqual(len(rows), 20)
+        self.assertEqual(rows[0], {'name': 'AA', 'shares': 15, 'price': 39.48})
+        data = structly.read_dat_as_columns('../../Data/portfolio.dat', [str, int, float],
+                                            ['name', 'shares', 'price'], columns=['shares'])
+        self.assertEqual(data.column('shares').tolist(), [100, 50, 150, 200, 95, 50, 100])
+        port, errors = structly.read_many(['../../Data/portfolio.dat', '../../Data/portfolio.csv'],
+                                          stock.Stock)
+        self.assertEqual((len(port), errors), (14, {}))
+        self.assertEqual(reader.read_records('../../Data/portfolio.dat', reader.instance_converter,
+                                             stock.Stock, headers=stock.Stock._fields, workers=2,
+                                             split=reader.dat_rows), port[:7])
+
+    def test_async(self):
+        async def collect(records):
+            return [ record async for record in records ]
+
+        async def from_stream(data):
+            stream = asyncio.StreamReader()
+            stream.feed_data(data)
+            stream.feed_eof()
+            return await collect(structly.aiter_csv_as_instances(stream, stock.Stock))
+
+        port = structly.read_csv_as_instances('../../Data/portfolio.csv', stock.Stock)
+        with open('../../Data/portfolio.csv', 'rb') as f:
+            data = f.read()
+        self.assertEqual(asyncio.run(from_stream(data + b'"X\nY",1,2.0\n')),
+                         port + [stock.Stock('X\nY', 1, 2.0)])
+        rows = asyncio.run(collect(structly.aiter_csv_as_dicts('../../Data/portfolio.csv',
+                                                               [str, int, float], batch_size=3)))
+        self.assertEqual(rows, structly.read_csv_as_dicts('../../Data/portfolio.csv', [str, int, float]))
+
+    def test_write(self):
+        port = structly.read_csv_as_instances('../../Data/portfolio.csv', stock.Stock)
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ['port.csv', 'port.csv.gz']:
+                filename = os.path.join(tmp, name)
+                structly.write_csv_from_instances(filename, port)
+                self.assertEqual(structly.read_csv_as_instances(filename, stock.Stock), port)
+            data = structly.read_csv_as_columns('../../Data/missing.csv',
+                                                [str, structly.nullable(int), float], errors='skip')
+            structly.write_csv_from_columns(filename, data)
+            self.assertEqual(list(structly.read_csv_as_columns(filename, [str, structly.nullable(int), float])),
+                             list(data))
+            for compress in ['bz2', '.xz']:
+                structly.write_csv_from_instances(filename, port, compress=compress)
+                self.assertEqual(structly.read_csv_as_instances(filename, stock.Stock), port)
+            with self.assertRaises(ValueError):
+                structly.write_csv_from_instances(filename, port, compress='zip')
+        f = io.StringIO()
+        structly.write_csv_from_dicts(f, [{'name': 'A,B', 'shares': 1}], ['name'])
+        self.assertEqual(f.getvalue(), 'name\n"A,B"\n')
+
+    def test_colfile(self):
+        port = structly.read_csv_as_instances('../../Data/portfolio.csv', stock.Stock)
+        data = structly.read_csv_as_columns('../../Data/missing.csv',
+                                            [str, structly.nullable(int), float], errors='skip')
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'port.col')
+            structly.write_colfile(filename, port)
+            with structly.read_colfile(filename, stock.Stock) as cols:
+                self.assertEqual(list(cols), port)
+                self.assertEqual(sum(cols.column('shares')), sum(s.shares for s in port))
+                # Slices are still rows of cls
+                self.assertEqual(list(cols[1:3]), port[1:3])
+                self.assertEqual((len(cols[5:]), cols[-2:][1]), (2, port[-1]))
+            # Numbers are little-endian, and swapped on big-endian machines
+            with open(filename, 'rb') as f:
+                self.assertIn((100).to_bytes(8, 'little') + (50).to_bytes(8, 'little'), f.read())
+            with mock.patch.object(colfile, 'sys', types.SimpleNamespace(byteorder='big')):
+                structly.write_colfile(filename, data)
+                with structly.read_colfile(filename) as cols:
+                    self.assertEqual(list(cols), list(data))
+            structly.write_colfile(filename, data)
+            with structly.read_colfile(filename) as cols:
+                self.assertEqual(list(cols), list(data))
+                self.assertEqual(cols.column('shares').null_count, data.column('shares').null_count)
+            structly.write_colfile(filename, [])
+            self.assertEqual(list(structly.read_colfile(filename)), [])
+
+            # Nullable strings, rewriting an open file and unstorable values
+            data = colreader.csv_as_columns(['a,b\n', ',1\n', 'x,2\n'],
+                                            [structly.nullable(str), int])
+            structly.write_colfile(filename, data)
+            with structly.read_colfile(filename) as cols:
+                self.assertEqual(list(cols), [{'a': None, 'b': 1}, {'a': 'x', 'b': 2}])
+                copy = os.path.join(tmp, 'copy.col')
+                structly.write_colfile(copy, cols)
+            with structly.read_colfile(copy) as cols:
+                self.assertEqual(cols.column('b').format, 'q')
+            with self.assertRaises(TypeError):
+                structly.write_colfile(filename, [{'a': object()}])
+
+    def test_batches(self):
+        batches = list(structly.read_csv_in_batches('../../Data/portfolio.csv', stock.Stock, 3))
+        self.assertEqual([len(b) for b in batches], [3, 3, 1])
+        self.assertEqual(sum(batches, []),
+                         structly.read_csv_as_instances('../../Data/portfolio.csv', stock.Stock))
+        blocks = list(structly.read_csv_in_batches('../../Data/portfolio.csv', [str, int, float], 4,
+                                                   columnar=True, columns=['name', 'shares']))
+        self.assertEqual([len(b) for b in blocks], [4, 3])
+        self.assertEqual(blocks[1][0], {'name': 'GE', 'shares': 95})
+        self.assertEqual(blocks[0].column('shares').typecode, 'q')
+
+if __name__ == '__main__':
+    unittest.main()
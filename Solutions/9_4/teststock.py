@@ -0,0 +1,251 @@
+# teststock.py
+
+import stock
+import pickle
+import unittest
+from structly import *
+from structly import validate
+
+class SlotStock(Structure, slots=True):
+    name = String()
+    shares = PositiveInteger()
+    price = PositiveFloat()
+
+    @property
+    def cost(self):
+        return self.shares * self.price
+
+    def sell(self, nshares: PositiveInteger):
+        self.shares -= nshares
+
+class TestStock(unittest.TestCase):
+    def test_create(self):
+        s = stock.Stock('GOOG', 100, 490.1)
+        self.assertEqual(s.name, 'GOOG')
+        self.assertEqual(s.shares, 100)
+        self.assertEqual(s.price, 490.1)
+
+    def test_create_keyword(self):
+        s = stock.Stock(name='GOOG', shares=100, price=490.1)
+        self.assertEqual(s.name, 'GOOG')
+        self.assertEqual(s.shares, 100)
+        self.assertEqual(s.price, 490.1)
+        
+    def test_cost(self):
+        s = stock.Stock('GOOG', 100, 490.1)
+        self.assertEqual(s.cost, 49010.0)
+
+    def test_sell(self):
+        s = stock.Stock('GOOG', 100, 490.1)
+        s.sell(25)
+        self.assertEqual(s.shares, 75)
+
+    def test_from_row(self):
+        s = stock.Stock.from_row(['GOOG','100','490.1'])
+        self.assertEqual(s.name, 'GOOG')
+        self.assertEqual(s.shares, 100)
+        self.assertEqual(s.price, 490.1)
+
+    def test_repr(self):
+        s = stock.Stock('GOOG', 100, 490.1)
+        self.assertEqual(repr(s), "Stock('GOOG', 100, 490.1)")
+
+    def test_eq(self):
+        a = stock.Stock('GOOG', 100, 490.1)
+        b = stock.Stock('GOOG', 100, 490.1)
+        self.assertTrue(a==b)
+
+    # Tests for failure conditions
+    def test_shares_badtype(self):
+        s = stock.Stock('GOOG', 100, 490.1)
+        with self.assertRaises(TypeError):
+            s.shares = '50'
+
+    def test_shares_badvalue(self):
+        s = stock.Stock('GOOG', 100, 490.1)
+        with self.assertRaises(ValueError):
+            s.shares = -50
+
+    def test_price_badtype(self):
+        s = stock.Stock('GOOG', 100, 490.1)
+        with self.assertRaises(TypeError):
+            s.price = '45.23'
+
+    def test_price_badvalue(self):
+        s = stock.Stock('GOOG', 100, 490.1)
+        with self.assertRaises(ValueError):
+            s.price = -45.23
+
+    def test_bad_attribute(self):
+        s = stock.Stock('GOOG', 100, 490.1)
+        with self.assertRaises(AttributeError):
+            s.share = 100
+
+class TestSlotStock(TestStock):
+    def setUp(self):
+        self.stock = stock.Stock
+        stock.Stock = SlotStock
+
+    def tearDown(self):
+        stock.Stock = self.stock
+
+    def test_repr(self):
+        s = stock.Stock('GOOG', 100, 490.1)
+        self.assertEqual(repr(s), "SlotStock('GOOG', 100, 490.1)")
+
+    def test_slots(self):
+        s = stock.Stock('GOOG', 100, 490.1)
+        self.assertFalse(hasattr(s, '__dict__'))
+        self.assertEqual(SlotStock.__slots__, ('_name', '_shares', '_price'))
+        self.assertIsInstance(SlotStock.shares, validate.PositiveInteger)
+        self.assertEqual(pickle.loads(pickle.dumps(s)), s)
+        with self.assertRaises(AttributeError):
+            s._shares = -5
+        self.assertEqual(s.shares, 100)
+
+    def test_projected_slots(self):
+        s = read_csv_as_instances('../../Data/portfolio.csv', SlotStock, columns=['name', 'price'])[0]
+        self.assertFalse(hasattr(s, '__dict__'))
+        self.assertEqual((s.name, s.price), ('AA', 32.2))
+        self.assertEqual(pickle.loads(pickle.dumps(s)), s)
+        with self.assertRaises(AttributeError):
+            s.shares = 10
+
+class Upper(validate.Validator):
+    @classmethod
+    def check(cls, value):
+        return super().check(value.upper())
+
+class Max(validate.Integer):
+    def __init__(self, hi, name=None):
+        super().__init__(name)
+        self.hi = hi
+
+    def check(self, value):
+        if value > self.hi:
+            raise ValueError('too big')
+        return super().check(value)
+
+class TestInit(unittest.TestCase):
+    # The generated __init__ must behave exactly like setting each field
+    # through its validator
+    values = [ 0, 1, -1, 2.5, -2.5, True, '', 'GOOG', None, [], [1] ]
+
+    def outcome(self, func):
+        try:
+            return ('ok', func())
+        except Exception as e:
+            return (type(e), str(e))
+
+    def check_same(self, cls, values):
+        def by_descriptor():
+            obj = cls.__new__(cls)
+            for name, value in zip(cls._fields, values):
+                setattr(obj, name, value)
+            return tuple(obj)
+        by_init = lambda: tuple(cls(*values))
+        self.assertEqual(self.outcome(by_init), self.outcome(by_descriptor), (cls, values))
+
+    def test_validators(self):
+        for slots in (False, True):
+            for name in ['Integer', 'Float', 'String', 'PositiveInteger',
+                         'PositiveFloat', 'NonEmptyString']:
+                cls = structure_class(getattr(validate, name), slots)
+                for value in self.values:
+                    self.check_same(cls, [value])
+
+    def test_fields(self):
+        for cls in [stock.Stock, SlotStock]:
+            for values in [('GOOG', 100, 490.1), ('GOOG', -1, 490.1), ('GOOG', 100, '490.1'),
+                           (None, -1, -1.0), ('', 0, 0.0)]:
+                self.check_same(cls, values)
+
+    def test_custom_check(self):
+        cls = structure_class(Upper, False)
+        self.check_same(cls, ['goog'])
+        self.check_same(cls, [1])
+        self.assertEqual(cls('goog').x, 'GOOG')
+        for slots in (False, True):
+            cls = structure_class(lambda: Max(5), slots)
+            for value in [3, 9, 2.5]:
+                self.check_same(cls, [value])
+            self.assertEqual(cls.from_rows([['3']])[0].x, 3)
+            with self.assertRaises(ValueError):
+                cls.from_rows([['9']])
+
+class TestFromRows(unittest.TestCase):
+    rows = [ ['GOOG', '100', '490.1'], ['AA', '50', '32.2'] ]
+
+    def test_from_rows(self):
+        for cls in [stock.Stock, SlotStock]:
+            self.assertEqual(cls.from_rows(self.rows), [ cls.from_row(row) for row in self.rows ])
+            self.assertEqual(cls.from_rows([]), [])
+
+    def test_from_columns(self):
+        data = stock.Stock.from_columns([['GOOG', 'AA'], [100, 50], [490.1, 32.2]], columnar=True)
+        self.assertEqual(list(data), [ dict(zip(stock.Stock._fields, s))
+                                       for s in stock.Stock.from_rows(self.rows) ])
+        self.assertEqual(data.column('shares').typecode, 'q')
+
+    def test_bad_rows(self):
+        with self.assertRaises(ValueError):
+            stock.Stock.from_rows(self.rows + [['IBM', '-1', '1.0']])
+        with self.assertRaises(ValueError):
+            stock.Stock.from_rows(self.rows + [['IBM', 'x', '1.0']])
+        with self.assertRaises(TypeError):
+            stock.Stock.from_columns([['IBM'], [1]])
+        with self.assertRaises(ValueError):
+            structure_class(validate.NonEmptyString, False).from_rows([['']])
+
+class TestStructureArray(unittest.TestCase):
+    def setUp(self):
+        self.port = [ stock.Stock('GOOG', 100, 490.1), stock.Stock('AA', 50, 32.2),
+                      stock.Stock('IBM', 75, 91.1) ]
+        self.array = StructureArray(stock.Stock, self.port)
+
+    def test_rows(self):
+        self.assertEqual(len(self.array), 3)
+        self.assertEqual(list(self.array), self.port)
+        self.assertEqual(self.array[-1], self.port[-1])
+        self.assertEqual(self.array[1].cost, self.port[1].cost)
+        self.assertIsInstance(self.array[0], stock.Stock)
+        self.assertEqual(pickle.loads(pickle.dumps(self.array[0])), self.port[0])
+
+    def test_columns(self):
+        self.assertEqual(self.array.column('shares').typecode, 'q')
+        self.assertEqual(self.array.column('price').typecode, 'd')
+        self.assertEqual(self.array.column('name'), ['GOOG', 'AA', 'IBM'])
+
+    def test_slice(self):
+        view = self.array[::-2]
+        self.assertEqual(list(view), self.port[::-2])
+        self.assertEqual(list(view.column('shares')), [75, 100])
+        view[0].sell(25)
+        self.assertEqual(self.array[2].shares, 50)
+        with self.assertRaises(TypeError):
+            view.append(self.port[0])
+
+    def test_validate(self):
+        row = self.array[0]
+        with self.assertRaises(ValueError):
+            row.shares = -1
+        with self.assertRaises(TypeError):
+            row.price = '1.0'
+        with self.assertRaises(AttributeError):
+            row.share = 1
+        with self.assertRaises(TypeError):
+            self.array.append(('GOOG', 100, 490.1))
+
+    def test_from_rows(self):
+        data = StructureArray.from_rows(SlotStock, [['GOOG', '100', '490.1'], ['AA', '50', '32.2']])
+        self.assertEqual(list(data), SlotStock.from_rows([['GOOG', '100', '490.1'], ['AA', '50', '32.2']]))
+        with self.assertRaises(ValueError):
+            StructureArray.from_rows(SlotStock, [['GOOG', '-1', '490.1']])
+
+def structure_class(validator, slots):
+    class Cls(Structure, slots=slots):
+        x = validator()
+    return Cls
+
+if __name__ == '__main__':
+    unittest.main()